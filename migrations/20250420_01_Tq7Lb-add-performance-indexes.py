@@ -0,0 +1,38 @@
+"""
+Add indexes for the filters used by the app
+"""
+
+from yoyo import step
+
+__depends__ = {'20250315_01_ssW97-add-payment-table'}
+
+# CREATE INDEX CONCURRENTLY can't run inside a transaction block
+__transactional__ = False
+
+steps = [
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS trainings_client_id_date_of_train_idx "
+        "ON trainings (client_id, date_of_train);",
+        "DROP INDEX CONCURRENTLY IF EXISTS trainings_client_id_date_of_train_idx;"
+    ),
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS users_created_at_idx "
+        "ON users (created_at);",
+        "DROP INDEX CONCURRENTLY IF EXISTS users_created_at_idx;"
+    ),
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS users_not_deleted_role_idx "
+        "ON users (role) WHERE deleted_at IS NULL;",
+        "DROP INDEX CONCURRENTLY IF EXISTS users_not_deleted_role_idx;"
+    ),
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS clients_active_expiration_date_idx "
+        "ON clients (expiration_date) WHERE status = 'ACTIVE';",
+        "DROP INDEX CONCURRENTLY IF EXISTS clients_active_expiration_date_idx;"
+    ),
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS trainings_exercises_exercise_id_idx "
+        "ON trainings_exercises (exercise_id);",
+        "DROP INDEX CONCURRENTLY IF EXISTS trainings_exercises_exercise_id_idx;"
+    ),
+]
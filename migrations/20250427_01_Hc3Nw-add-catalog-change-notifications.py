@@ -0,0 +1,37 @@
+"""
+Notify the app workers about the changes of the catalog tables
+"""
+
+from yoyo import step
+
+__depends__ = {'20250420_01_Tq7Lb-add-performance-indexes'}
+
+steps = [
+    step(
+        """
+        CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('catalog_changes', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        "DROP FUNCTION IF EXISTS notify_catalog_change();"
+    ),
+    step(
+        """
+        CREATE TRIGGER memberships_notify_catalog_change
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON memberships
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+        """,
+        "DROP TRIGGER IF EXISTS memberships_notify_catalog_change ON memberships;"
+    ),
+    step(
+        """
+        CREATE TRIGGER exercises_notify_catalog_change
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON exercises
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+        """,
+        "DROP TRIGGER IF EXISTS exercises_notify_catalog_change ON exercises;"
+    ),
+]
@@ -0,0 +1,20 @@
+"""
+Keep the high-water marks of the periodic sweepers
+"""
+
+from yoyo import step
+
+__depends__ = {'20250427_01_Hc3Nw-add-catalog-change-notifications'}
+
+steps = [
+    step(
+        """
+        CREATE TABLE IF NOT EXISTS Sweeper_watermarks (
+            name VARCHAR(50) PRIMARY KEY,
+            high_water_mark TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        "DROP TABLE IF EXISTS Sweeper_watermarks;"
+    ),
+]
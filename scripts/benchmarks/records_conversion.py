@@ -0,0 +1,82 @@
+"""
+Compare the validated and the trusted conversion of the repository rows into the response models.
+The trusted conversion is measured for the rows with exactly the model fields and for the rows
+with an extra column, which are built by model_construct.
+
+Run from the project root:
+    python -m scripts.benchmarks.records_conversion --rows 500 --repeat 50
+"""
+import argparse
+import timeit
+import warnings
+from datetime import date, datetime
+from decimal import Decimal
+
+from trainings_app.schemas.clients import GetClient
+from trainings_app.schemas.users import GetUser
+from trainings_app.utils.records import models_from_records
+
+
+def client_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": n,
+            "user_id": n,
+            "membership_id": 1,
+            "first_name": f"FirstName{n}",
+            "last_name": f"LastName{n}",
+            "phone_number": f"+1234567{n:04}",
+            "gender": "MALE",
+            "date_of_birth": date(1988, 10, 25),
+            "weight_kg": Decimal("80.50"),
+            "height_cm": Decimal("180.00"),
+            "status": "ACTIVE",
+            "expiration_date": datetime(2025, 1, 1),
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def user_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": n,
+            "username": f"user{n}",
+            "password_hash": "$2b$12$" + "x" * 53,
+            "email": f"user{n}@example.com",
+            "role": "USER",
+            "created_at": datetime(2025, 1, 1),
+            "last_login": None,
+            "deleted_at": None,
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def run(rows: int, repeat: int) -> None:
+    print(f"{'model':<12}{'validated, ms':>16}{'trusted, ms':>14}{'speedup':>10}{'extra column, ms':>19}")
+    for model, records in ((GetClient, client_rows(rows)), (GetUser, user_rows(rows))):
+        extended = [dict(record, extra_column=1) for record in records]
+        # All the paths must produce equal models that serialize without warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            validated_models = [model(**record) for record in records]
+            assert models_from_records(model, records) == validated_models
+            assert models_from_records(model, extended) == validated_models
+            [item.model_dump_json() for item in models_from_records(model, records)]
+
+        validated = min(timeit.repeat(lambda: [model(**record) for record in records], number=1, repeat=repeat))
+        trusted = min(timeit.repeat(lambda: models_from_records(model, records), number=1, repeat=repeat))
+        constructed = min(timeit.repeat(lambda: models_from_records(model, extended), number=1, repeat=repeat))
+        print(
+            f"{model.__name__:<12}{validated * 1000:>16.3f}{trusted * 1000:>14.3f}{validated / trusted:>9.1f}x"
+            f"{constructed * 1000:>19.3f}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="Rows per list, the max page size by default")
+    parser.add_argument("--repeat", type=int, default=50, help="Number of measurements, the best one is reported")
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
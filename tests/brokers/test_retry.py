@@ -0,0 +1,109 @@
+from typing import Optional
+
+import pytest
+
+from trainings_app.brokers.retry import ATTEMPTS_HEADER, ERROR_HEADER, RetryTopology, parking_queue_name, \
+    retry_queue_name
+
+QUEUE_NAME = 'test_payment_queue'
+test_config = {
+    'MAX_ATTEMPTS': 3,
+    'BASE_DELAY_MS': 1000,
+    'MAX_DELAY_MS': 60_000,
+}
+
+
+class Message:
+    def __init__(self, body: bytes = b'{}', headers: Optional[dict] = None):
+        self.body = body
+        self.headers = headers
+        self.content_type = 'application/json'
+        self.message_id = 'message-id'
+        self.acked = False
+
+    async def ack(self) -> None:
+        self.acked = True
+
+
+class Exchange:
+    def __init__(self):
+        self.published: list[tuple[str, Message]] = []
+
+    async def publish(self, message, routing_key: str) -> None:
+        self.published.append((routing_key, message))
+
+
+class Queue:
+    def __init__(self, messages: list[Message]):
+        self.messages = messages
+
+    async def get(self, no_ack: bool, fail: bool) -> Optional[Message]:
+        return self.messages.pop(0) if self.messages else None
+
+
+class Channel:
+    def __init__(self, parked: Optional[list[Message]] = None):
+        self.default_exchange = Exchange()
+        self.declared: dict[str, Optional[dict]] = {}
+        self.parking = Queue(parked or [])
+
+    async def declare_queue(self, name: str, durable: bool, arguments: Optional[dict] = None) -> Queue:
+        self.declared[name] = arguments
+        return self.parking
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=38)
+async def test_retry_routing():
+    channel = Channel()
+    retry = RetryTopology(channel, QUEUE_NAME, test_config)
+    await retry.declare()
+    assert channel.declared == {
+        retry_queue_name(QUEUE_NAME, 1000): {
+            'x-message-ttl': 1000, 'x-dead-letter-exchange': '', 'x-dead-letter-routing-key': QUEUE_NAME,
+        },
+        retry_queue_name(QUEUE_NAME, 2000): {
+            'x-message-ttl': 2000, 'x-dead-letter-exchange': '', 'x-dead-letter-routing-key': QUEUE_NAME,
+        },
+        parking_queue_name(QUEUE_NAME): None,
+    }
+
+    # No header is the first delivery
+    first = Message()
+    await retry.retry(first, error='Postgres is down')
+    routing_key, published = channel.default_exchange.published[-1]
+    assert routing_key == retry_queue_name(QUEUE_NAME, 1000)
+    assert published.headers[ATTEMPTS_HEADER] == 2
+    assert published.headers[ERROR_HEADER] == 'Postgres is down'
+    assert first.acked
+
+    await retry.retry(Message(headers={ATTEMPTS_HEADER: 2}), error='Postgres is down')
+    routing_key, published = channel.default_exchange.published[-1]
+    assert routing_key == retry_queue_name(QUEUE_NAME, 2000)
+    assert published.headers[ATTEMPTS_HEADER] == 3
+
+    await retry.retry(Message(headers={ATTEMPTS_HEADER: 3}), error='Postgres is down')
+    routing_key, published = channel.default_exchange.published[-1]
+    assert routing_key == parking_queue_name(QUEUE_NAME)
+    assert published.headers[ATTEMPTS_HEADER] == 3
+
+    await retry.park(Message(), error='Invalid payment message')
+    routing_key, published = channel.default_exchange.published[-1]
+    assert routing_key == parking_queue_name(QUEUE_NAME)
+    assert published.headers[ATTEMPTS_HEADER] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=39)
+async def test_replay_parked():
+    parked = [
+        Message(body=b'{"n": 1}', headers={ATTEMPTS_HEADER: 3, ERROR_HEADER: 'Postgres is down', 'trace': 'a'}),
+        Message(body=b'{"n": 2}', headers={ATTEMPTS_HEADER: 1, ERROR_HEADER: 'Invalid payment message'}),
+    ]
+    originals = list(parked)
+    channel = Channel(parked)
+    assert await RetryTopology(channel, QUEUE_NAME, test_config).replay(limit=10) == 2
+    assert [routing_key for routing_key, _ in channel.default_exchange.published] == [QUEUE_NAME, QUEUE_NAME]
+    assert [message.body for _, message in channel.default_exchange.published] == [b'{"n": 1}', b'{"n": 2}']
+    assert [message.headers for _, message in channel.default_exchange.published] == [{'trace': 'a'}, {}]
+    assert all(message.acked for message in originals)
@@ -1,6 +1,5 @@
 import asyncio
 import pytest
-import json
 import asyncpg
 import pytest_asyncio
 
@@ -10,6 +9,7 @@ from pathlib import Path
 from yoyo import read_migrations, get_backend
 
 from trainings_app.custom_loggers.test_db import test_db_logger as logger
+from trainings_app.db.connection import init_connection
 from trainings_app.exceptions.exceptions import UninitializedDatabasePoolError
 from trainings_app.repositories.base import BaseRepository
 from trainings_app.settings import settings_test_db
@@ -66,6 +66,7 @@ class TestAsyncpgPool:
             try:
                 cls.db_pool = await asyncpg.create_pool(
                     dsn=local_test_uri,
+                    init=init_connection,
                 )
             except Exception as e:
                 logger.error(f"Postgres initialisation Error: {e}")
@@ -108,12 +109,6 @@ async def get_conn(db_pool: Pool) -> Connection:
     """Retrieve the connection from the pool."""
     conn = await db_pool.acquire()
     try:
-        await conn.set_type_codec(
-            "json",
-            encoder=json.dumps,
-            decoder=json.loads,
-            schema='pg_catalog',
-        )
         yield conn
     finally:
         await conn.close()
@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import status
+from pydantic import BaseModel
+
+from trainings_app.db_redis.idempotency import IdempotencyStore
+from trainings_app.exceptions.exceptions import IdempotencyKeyError
+
+
+class Result(BaseModel):
+    id: int
+
+
+class CallCounter:
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+
+    async def __call__(self) -> Result:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.error is not None:
+            raise self.error
+        return Result(id=self.calls)
+
+
+def new_key() -> str:
+    return uuid.uuid4().hex
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=33)
+async def test_idempotency_coalescing():
+    store = IdempotencyStore('test', Result)
+    call = CallCounter()
+    key = new_key()
+    first, second = await asyncio.gather(store.run(key, 'fingerprint', call), store.run(key, 'fingerprint', call))
+    assert call.calls == 1
+    assert first == second == Result(id=1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=34)
+async def test_idempotency_leader_cancelled():
+    store = IdempotencyStore('test', Result)
+    call = CallCounter()
+    key = new_key()
+    leader = asyncio.create_task(store.run(key, 'fingerprint', call))
+    await asyncio.sleep(0.01)
+    duplicate = asyncio.create_task(store.run(key, 'fingerprint', call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    with pytest.raises(IdempotencyKeyError) as error:
+        await duplicate
+    assert error.value.status_code == status.HTTP_409_CONFLICT
+    assert not duplicate.cancelled()
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=35)
+async def test_idempotency_fingerprint_mismatch():
+    store = IdempotencyStore('test', Result)
+    call = CallCounter()
+    key = new_key()
+    in_flight = asyncio.create_task(store.run(key, 'fingerprint', call))
+    await asyncio.sleep(0)
+    with pytest.raises(IdempotencyKeyError) as in_flight_error:
+        await store.run(key, 'another fingerprint', call)
+    assert in_flight_error.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    await in_flight
+    with pytest.raises(IdempotencyKeyError) as stored_error:
+        await IdempotencyStore('test', Result).run(key, 'another fingerprint', call)
+    assert stored_error.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=36)
+async def test_idempotency_replay():
+    call = CallCounter()
+    key = new_key()
+    result = await IdempotencyStore('test', Result).run(key, 'fingerprint', call)
+    # Another store stands for another process, the result comes from Redis
+    assert await IdempotencyStore('test', Result).run(key, 'fingerprint', call) == result
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=37)
+async def test_idempotency_failures():
+    store = IdempotencyStore('test', Result, retryable=lambda error: isinstance(error, ConnectionError))
+    key = new_key()
+    not_sent = CallCounter(error=ConnectionError("Not sent"))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await store.run(key, 'fingerprint', not_sent)
+    assert not_sent.calls == 2
+
+    key = new_key()
+    sent = CallCounter(error=TimeoutError("Read timed out"))
+    with pytest.raises(TimeoutError):
+        await store.run(key, 'fingerprint', sent)
+    with pytest.raises(IdempotencyKeyError) as stored_error:
+        await store.run(key, 'fingerprint', sent)
+    assert stored_error.value.status_code == status.HTTP_502_BAD_GATEWAY
+    assert sent.calls == 1
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import pytest
+
+from trainings_app.exceptions.exceptions import PaymentServiceError, PaymentServiceUnavailableError
+from trainings_app.payment_service.circuit_breaker import CircuitBreaker, CircuitStateEnum
+from trainings_app.payment_service.client import PaymentServiceClient
+from trainings_app.payment_service.settings import PAYMENT_CLIENT_CONFIG
+
+test_config = {
+    **PAYMENT_CLIENT_CONFIG,
+    'MAX_RETRIES': 2,
+    'RETRY_BASE_DELAY': 0,
+    'RETRY_MAX_DELAY': 0,
+    'BREAKER_FAILURE_THRESHOLD': 3,
+    'BREAKER_RESET_TIMEOUT': 0,
+}
+
+
+def make_client(handler) -> PaymentServiceClient:
+    client = PaymentServiceClient(test_config)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=29)
+async def test_circuit_breaker_states():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitStateEnum.CLOSED
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitStateEnum.OPEN
+    assert not breaker.allow()
+
+    breaker.reset_timeout = 0
+    assert breaker.allow()
+    assert breaker.state == CircuitStateEnum.HALF_OPEN
+    assert not breaker.allow()
+    breaker.release_trial()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitStateEnum.OPEN
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitStateEnum.CLOSED
+    assert breaker.failures == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=30)
+async def test_payment_client_retries():
+    calls = []
+
+    def not_connected(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) <= 2:
+            raise httpx.ConnectError("Connection refused", request=request)
+        return httpx.Response(201, json={"id": 1})
+
+    assert await make_client(not_connected)._call("http://payments/", {}) == {"id": 1}
+    assert len(calls) == 3
+
+    calls.clear()
+
+    def read_timeout(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ReadTimeout("Read timed out", request=request)
+
+    client = make_client(read_timeout)
+    with pytest.raises(PaymentServiceError):
+        await client._call("http://payments/", {})
+    assert len(calls) == 1
+    assert client.breaker.failures == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=31)
+async def test_payment_client_failures():
+    status_codes = iter([400, 404, 500, 503])
+    client = make_client(lambda request: httpx.Response(next(status_codes)))
+    for _ in range(2):
+        with pytest.raises(PaymentServiceError):
+            await client._call("http://payments/", {})
+    assert client.breaker.failures == 0
+    for _ in range(2):
+        with pytest.raises(PaymentServiceError):
+            await client._call("http://payments/", {})
+    assert client.breaker.failures == 2
+    assert client.breaker.state == CircuitStateEnum.CLOSED
+
+    client.breaker.reset_timeout = 60
+    client.breaker.record_failure()
+    with pytest.raises(PaymentServiceUnavailableError):
+        await client._call("http://payments/", {})
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=32)
+async def test_payment_client_cancelled_trial():
+    async def hanging(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(60)
+        return httpx.Response(201, json={})
+
+    client = make_client(hanging)
+    for _ in range(test_config['BREAKER_FAILURE_THRESHOLD']):
+        client.breaker.record_failure()
+    call = asyncio.create_task(client._call("http://payments/", {}))
+    await asyncio.sleep(0.01)
+    assert client.breaker.state == CircuitStateEnum.HALF_OPEN
+    assert not client.breaker.allow()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    assert client.breaker.allow()
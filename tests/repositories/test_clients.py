@@ -4,7 +4,10 @@ import pytest
 
 from tests.conftest import get_repo
 from trainings_app.brokers.consumer import get_system_user
+from trainings_app.check_membership.sweeper import MEMBERSHIP_SWEEPER_CONFIG, sweep_expired_memberships
+from trainings_app.exceptions.exceptions import AccessError, RecordNotFoundError
 from trainings_app.repositories.clients import ClientRepository
+from trainings_app.schemas.users import RoleEnum
 
 system_user = get_system_user()
 
@@ -130,3 +133,58 @@ async def test_delete_client(get_repo):
     assert delete_client is not None
     assert delete_client.id == 2
     assert delete_client.first_name == "ExtraUser"
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=25)
+async def test_client_write_access(get_repo):
+    client_repo = get_repo(ClientRepository)
+    other_user = system_user.model_copy(update={"id": 3, "role": RoleEnum.USER})
+    with pytest.raises(AccessError):
+        await client_repo.update(1, {"phone_number": "+1000000000"}, user=other_user)
+    with pytest.raises(AccessError):
+        await client_repo.delete(1, user=other_user)
+    with pytest.raises(RecordNotFoundError):
+        await client_repo.update(100_000, {"phone_number": "+1000000000"}, user=system_user)
+    owner = system_user.model_copy(update={"role": RoleEnum.USER})
+    update_client = await client_repo.update(1, {"phone_number": "+1000000000"}, user=owner)
+    assert update_client.phone_number == "+1000000000"
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=27)
+async def test_client_version(get_repo):
+    client_repo = get_repo(ClientRepository)
+    client, version = await client_repo.get_with_version(1)
+    assert client.id == 1
+    version_record = await client_repo.get_version(1)
+    assert version_record["version"] == version
+    assert version_record["user_id"] == client.user_id
+    await client_repo.update(1, {"phone_number": "+1000000001"}, user=system_user)
+    assert (await client_repo.get_version(1))["version"] != version
+    with pytest.raises(RecordNotFoundError):
+        await client_repo.get_version(100_000)
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=28)
+async def test_client_expiry(get_repo):
+    client_repo = get_repo(ClientRepository)
+    now = datetime.utcnow()
+    assert await client_repo.activate_many({1: now - timedelta(days=1), 100_000: now}) == [1]
+    assert (await client_repo.get(1)).status == "ACTIVE"
+    expired = await client_repo.deactivate_expired(after=now - timedelta(days=2), until=now, limit=10)
+    assert [record["id"] for record in expired] == [1]
+    assert (await client_repo.get(1)).status == "INACTIVE"
+    assert await client_repo.deactivate_expired(after=now - timedelta(days=2), until=now, limit=10) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=40)
+async def test_membership_sweeper(get_conn):
+    config = {**MEMBERSHIP_SWEEPER_CONFIG, 'LOOKBACK_SEC': 0, 'CATCH_UP_INTERVAL_SEC': 3600}
+    await sweep_expired_memberships(get_conn, config)
+    # Activated by a late payment event, the expiration is below the high-water mark
+    await ClientRepository(get_conn).activate_many({1: datetime.utcnow() - timedelta(days=1)})
+    assert 1 not in await sweep_expired_memberships(get_conn, config)
+    assert 1 in await sweep_expired_memberships(get_conn, {**config, 'CATCH_UP_INTERVAL_SEC': 0})
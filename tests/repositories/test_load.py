@@ -1,11 +1,14 @@
 import random
 from datetime import date, datetime, timedelta
 
+import orjson
 import pytest
 
 from tests.conftest import get_repo
+from trainings_app.exceptions.exceptions import AttrError
 from trainings_app.repositories.clients import ClientRepository
 from trainings_app.repositories.users import UserRepository
+from trainings_app.schemas.users import GetUser
 
 
 @pytest.mark.asyncio
@@ -50,3 +53,68 @@ async def test_create_user(get_repo):
         except Exception as e:
             pytest.fail(f"User creation failed: {e}")
         print(f"Load Test {n} PASSED! - {datetime.utcnow()}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=21)
+async def test_get_clients_pages(get_repo):
+    client_repo = get_repo(ClientRepository)
+    all_clients = await client_repo.get_clients()
+    paged_ids = []
+    after = None
+    while True:
+        page = await client_repo.get_clients(limit=10, after=after)
+        if not page:
+            break
+        assert len(page) <= 10
+        paged_ids.extend(client.id for client in page)
+        after = (page[-1].id,)
+    assert paged_ids == sorted(paged_ids)
+    assert paged_ids == [client.id for client in all_clients]
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=22)
+async def test_create_users_bulk(get_repo):
+    user_repo = get_repo(UserRepository)
+    users_data = [
+        {
+            "username": f"bulk{n}_user",
+            "password_hash": "test_password",
+            "email": f"bulk{n}_user@example.com",
+            "role": "USER",
+        }
+        for n in range(1, 100)
+    ]
+    created_users = await user_repo.create_many(users_data + users_data[:1])
+    assert len(created_users) == 100
+    assert all(user is not None for user in created_users[:99])
+    assert created_users[99] is None
+    assert [user.username for user in created_users[:99]] == [f"bulk{n}_user" for n in range(1, 100)]
+
+    repeated_users = await user_repo.create_many(users_data[:1])
+    assert repeated_users == [None]
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=23)
+async def test_query_templates(get_repo):
+    user_repo = get_repo(UserRepository)
+    first_query, first_values = user_repo.make_list_query({"role": "USER", "username": "test1_user"}, limit=10)
+    second_query, second_values = user_repo.make_list_query({"username": "test2_user", "role": "USER"}, limit=10)
+    assert first_query is second_query
+    assert first_values == ["USER", "test1_user", 10]
+    assert second_values == ["USER", "test2_user", 10]
+
+    with pytest.raises(AttrError):
+        user_repo.make_update_query({"username": "test1_user", "id = id; --": 1}, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=24)
+async def test_get_users_json(get_repo):
+    user_repo = get_repo(UserRepository)
+    users = await user_repo.get_users(None, limit=10)
+    json_records = await user_repo.get_json_list(None, limit=10)
+    assert [record["id"] for record in json_records] == [user.id for user in users]
+    assert [GetUser(**orjson.loads(record["json"])) for record in json_records] == users
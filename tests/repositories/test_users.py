@@ -3,6 +3,7 @@ import pytest
 
 from tests.conftest import get_repo
 
+from trainings_app.repositories.identity_map import IdentityMap
 from trainings_app.repositories.users import UserRepository
 
 
@@ -121,3 +122,16 @@ async def test_extra_create_user(get_repo):
     assert create_user is not None
     assert create_user.username == "test003_user"
     assert create_user.id == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.run(order=26)
+async def test_identity_map(get_repo):
+    identity_map = IdentityMap()
+    user_repo = get_repo(UserRepository)
+    user_repo.identity_map = identity_map
+    user = await user_repo.get(1)
+    assert identity_map.get(UserRepository.table, (1,)) is user
+    assert await UserRepository(user_repo.conn, identity_map).get(1) is user
+    update_user = await user_repo.update(1, {"email": "identity_map@example.com"})
+    assert await user_repo.get(1) is update_user
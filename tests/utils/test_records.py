@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from trainings_app.exceptions.exceptions import ConvertRecordError
+from trainings_app.schemas.clients import ClientStatusEnum, GenderEnum, GetClient
+from trainings_app.utils.records import model_from_record, models_from_records
+
+record = {
+    'id': 1,
+    'user_id': 1,
+    'membership_id': 1,
+    'first_name': 'FirstName',
+    'last_name': 'LastName',
+    'phone_number': '+12345670001',
+    'gender': 'MALE',
+    'date_of_birth': date(1988, 10, 25),
+    'weight_kg': Decimal('80.50'),
+    'height_cm': None,
+    'status': 'ACTIVE',
+    'expiration_date': datetime(2025, 1, 1),
+}
+
+
+def state(model) -> tuple:
+    return model.__dict__, model.__pydantic_fields_set__, model.__pydantic_extra__, model.__pydantic_private__
+
+
+@pytest.mark.run(order=41)
+def test_model_from_record():
+    # A row with exactly the model fields skips model_construct, the instance state must be the same
+    client = model_from_record(GetClient, record)
+    expected = GetClient.model_construct(**dict(
+        record, gender=GenderEnum.MALE, weight_kg=80.5, status=ClientStatusEnum.ACTIVE
+    ))
+    assert state(client) == state(expected)
+    assert client == GetClient(**record)
+    assert client.model_dump_json() == GetClient(**record).model_dump_json()
+
+    # A row of the same length with an unknown column instead of a field is built by model_construct
+    mismatched = {key: value for key, value in record.items() if key != 'expiration_date'}
+    mismatched['unknown'] = 1
+    client = model_from_record(GetClient, mismatched)
+    assert client.__dict__.keys() == client.__pydantic_fields_set__ == set(mismatched) - {'unknown'}
+
+
+@pytest.mark.run(order=42)
+def test_models_from_records_unknown_enum():
+    with pytest.raises(ConvertRecordError) as e:
+        models_from_records(GetClient, [record, dict(record, id=2, status='UNKNOWN')])
+    assert e.value.record['id'] == 2
+    assert 'UNKNOWN' in e.value.error_detail
@@ -3,7 +3,8 @@ import abc
 from asyncpg import Connection
 
 from trainings_app.db.fields.users import UserFields
-from trainings_app.utils.password_hashing import verify_password
+from trainings_app.db_redis.user_cache import invalidate_user
+from trainings_app.utils.password_hashing import verify_and_update_password
 
 
 class BaseRepository(abc.ABC):
@@ -22,6 +23,21 @@ class AuthJWTRepository(BaseRepository):
             WHERE username = $1;
         """
         user_record = await self.conn.fetchrow(query, username)
-        if not user_record or not verify_password(password, user_record["password_hash"]):
+        if not user_record:
             return None
+        is_valid, new_password_hash = await verify_and_update_password(password, user_record["password_hash"])
+        if not is_valid:
+            return None
+        if new_password_hash:
+            await self.rehash_password(user_record["id"], user_record["password_hash"], new_password_hash)
         return user_record
+
+    async def rehash_password(self, user_id: int, old_password_hash: str, new_password_hash: str) -> None:
+        """Store the hash made with the current settings, unless the password changed meanwhile."""
+        query = """
+            UPDATE users
+            SET password_hash = $3
+            WHERE id = $1 AND password_hash = $2;
+        """
+        await self.conn.execute(query, user_id, old_password_hash, new_password_hash)
+        await invalidate_user(user_id)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from pydantic import BaseModel
@@ -5,11 +6,27 @@ from pydantic import BaseModel
 BASE_DIR = Path(__file__).parent
 
 
+def get_previous_public_keys() -> dict[str, Path]:
+    """Read the public keys of the rotated out signing keys, e.g. JWT_PREVIOUS_PUBLIC_KEYS=2024-12=/certs/old.pem"""
+    keys = {}
+    for item in os.getenv("JWT_PREVIOUS_PUBLIC_KEYS", "").split(","):
+        if item.strip():
+            kid, path = item.split("=", 1)
+            keys[kid.strip()] = Path(path.strip())
+    return keys
+
+
 class AuthJWT(BaseModel):
     private_key_path: Path = Path(BASE_DIR, "certs", "jwt-private.pem")
     public_key_path: Path = Path(BASE_DIR, "certs", "jwt-public.pem")
+    # Algorithm for the RSA keys, the Ed25519 keys are always used with EdDSA
     algorithm: str = "RS256"
+    # The kid header of the tokens signed by the current key
+    kid: str = os.getenv("JWT_KID", "main")
+    previous_public_keys: dict[str, Path] = get_previous_public_keys()
     access_token_expire_minutes: int = 15
+    verified_tokens_cache_size: int = int(os.getenv("JWT_VERIFIED_TOKENS_CACHE_SIZE", 10_000))
+    verified_tokens_cache_ttl_sec: int = int(os.getenv("JWT_VERIFIED_TOKENS_CACHE_TTL_SEC", 300))
 
 
 auth_jwt: AuthJWT = AuthJWT()
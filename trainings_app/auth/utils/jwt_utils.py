@@ -1,23 +1,42 @@
+import hashlib
+import time
 from datetime import timedelta, datetime
 from typing import Callable, Awaitable, Optional
 
 import jwt
+from asyncpg import Pool
 
 
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
 
 from trainings_app.auth import settings
-from trainings_app.db.connection import get_repo
+from trainings_app.auth.utils.keys import JWTKeyManager
+from trainings_app.db.connection import get_api_pool, get_identity_map
+from trainings_app.db_redis.user_cache import get_cached_user, cache_user
 from trainings_app.exceptions.exceptions import TokenError
+from trainings_app.repositories.identity_map import IdentityMap
 from trainings_app.repositories.users import UserRepository
 from trainings_app.schemas.users import GetUser, RoleEnum
+from trainings_app.utils.cache import TTLCache
+
+
+jwt_keys = JWTKeyManager(
+    private_key_path=settings.auth_jwt.private_key_path,
+    public_key_path=settings.auth_jwt.public_key_path,
+    kid=settings.auth_jwt.kid,
+    rsa_algorithm=settings.auth_jwt.algorithm,
+    previous_public_keys=settings.auth_jwt.previous_public_keys,
+)
+# Payloads of the verified tokens by the token hash, an entry lives no longer than the token
+verified_tokens: TTLCache[dict] = TTLCache(
+    maxsize=settings.auth_jwt.verified_tokens_cache_size,
+    ttl=settings.auth_jwt.verified_tokens_cache_ttl_sec,
+)
 
 
 def encode_jwt(
         payload: dict,
-        private_key: str = settings.auth_jwt.private_key_path.read_text(),
-        algorithm: str = settings.auth_jwt.algorithm,
         expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
         expire_timedelta: timedelta | None = None,
 ) -> str:
@@ -34,33 +53,35 @@ def encode_jwt(
     )
     encoded = jwt.encode(
         to_encode,
-        private_key,
-        algorithm=algorithm,
+        jwt_keys.private_key,
+        algorithm=jwt_keys.signing_algorithm,
+        headers={"kid": jwt_keys.kid},
     )
     return encoded
 
 
-def decode_jwt(
-        token: str | bytes,
-        public_key: str = settings.auth_jwt.public_key_path.read_text(),
-        algorithm: str = settings.auth_jwt.algorithm,
-) -> dict:
-    """Custom function for the JWT decoding."""
+def decode_jwt(token: str | bytes) -> dict:
+    """Custom function for the JWT decoding. Returns a copy of the payload, so callers may change it."""
+    token_hash = hashlib.sha256(token.encode() if isinstance(token, str) else token).digest()
+    payload = verified_tokens.get(token_hash)
+    if payload is not None:
+        return payload.copy()
     try:
-        decoded = jwt.decode(
+        public_key = jwt_keys.get_public_key(jwt.get_unverified_header(token).get("kid"))
+        payload = jwt.decode(
             token,
             public_key,
-            algorithms=[algorithm]
+            algorithms=[jwt_keys.algorithm_for(public_key)]
         )
-        return decoded
     except jwt.ExpiredSignatureError:
         raise TokenError("Token has expired")
     except jwt.InvalidTokenError:
         raise TokenError(f"""Invalid token:
         token: {token},
-        public_key: {public_key},
-        algorithms: {algorithm} в листе,
         """)
+    if "exp" in payload:
+        verified_tokens.set(token_hash, payload, ttl=payload["exp"] - time.time())
+    return payload.copy()
 
 
 oauth2_scheme = HTTPBearer()
@@ -84,10 +105,22 @@ async def get_current_token_payload(
 
 async def get_current_auth_user(
         payload: dict = Depends(get_current_token_payload),
-        user_repo: UserRepository = Depends(get_repo(UserRepository)),
+        pool: Pool = Depends(get_api_pool),
+        identity_map: IdentityMap = Depends(get_identity_map),
 ) -> GetUser:
-    """Retrieves and returns UserID from the token payload"""
-    return await user_repo.get(user_id=int(payload.get('sub')))
+    """
+    Retrieves and returns the user of the token payload.
+    The pool connection is acquired only on a cache miss.
+    Only the user loaded from the DB gets into the identity map of the request: the cached copy can be stale,
+    so a route reading the user through the repository still gets the row.
+    """
+    user_id = int(payload.get('sub'))
+    user = await get_cached_user(user_id)
+    if user is None:
+        async with pool.acquire() as conn:
+            user = await UserRepository(conn, identity_map).get(user_id=user_id)
+        await cache_user(user)
+    return user
 
 
 def get_current_auth_user_with_role(
@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Optional, Union
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes as PrivateKey
+from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes as PublicKey
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+from trainings_app.exceptions.exceptions import TokenError
+
+
+class JWTKeyManager:
+    """
+    Parses the PEM keys once and keeps the key objects by kid.
+    Tokens are signed by the current key, the previous public keys still verify the tokens issued before a rotation.
+    """
+
+    def __init__(
+            self,
+            private_key_path: Path,
+            public_key_path: Path,
+            kid: str,
+            rsa_algorithm: str,
+            previous_public_keys: Optional[dict[str, Path]] = None,
+    ):
+        self.kid = kid
+        self.rsa_algorithm = rsa_algorithm
+        self.private_key: PrivateKey = load_pem_private_key(private_key_path.read_bytes(), password=None)
+        self.public_keys: dict[str, PublicKey] = {
+            previous_kid: load_pem_public_key(path.read_bytes())
+            for previous_kid, path in (previous_public_keys or {}).items()
+        }
+        self.public_keys[kid] = load_pem_public_key(public_key_path.read_bytes())
+
+    def algorithm_for(self, key: Union[PrivateKey, PublicKey]) -> str:
+        """EdDSA for the Ed25519 keys, the configured RSA algorithm otherwise."""
+        if isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            return "EdDSA"
+        return self.rsa_algorithm
+
+    @property
+    def signing_algorithm(self) -> str:
+        return self.algorithm_for(self.private_key)
+
+    def get_public_key(self, kid: Optional[str]) -> PublicKey:
+        """The public key of the kid header, tokens without kid were signed by the current key."""
+        key = self.public_keys.get(kid or self.kid)
+        if key is None:
+            raise TokenError(f"Unknown key id: {kid}")
+        return key
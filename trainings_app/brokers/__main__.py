@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, status
+from fastapi.responses import ORJSONResponse
+
+from trainings_app.brokers.consumer import PaymentConsumer, PAYMENT_CONSUMER_CONFIG
+from trainings_app.brokers.retry import replay_parked
+from trainings_app.custom_loggers.console_debug import console_logger
+from trainings_app.db.connection import AsyncpgPool, CONSUMER_POOL
+
+payment_consumer = PaymentConsumer()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await AsyncpgPool.setup(CONSUMER_POOL)
+    # Fails the start if the broker is unreachable, the container is restarted
+    await payment_consumer.start()
+    yield
+    await payment_consumer.stop()
+    await AsyncpgPool.close_pool(CONSUMER_POOL)
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+@app.get('/health', tags=['Health'])
+async def health_check() -> ORJSONResponse:
+    """Returns the running status of the consumer, 503 while it isn't subscribed to the queue"""
+    if payment_consumer.is_consuming:
+        return ORJSONResponse({'status': 'ok'})
+    return ORJSONResponse({'status': 'unavailable'}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m trainings_app.brokers', description='Payment events consumer')
+    commands = parser.add_subparsers(dest='command')
+    replay = commands.add_parser('replay-parked', help='Return the parked messages to the payment queue')
+    replay.add_argument('--limit', type=int, default=None, help='Replay at most that many messages')
+    args = parser.parse_args()
+
+    if args.command == 'replay-parked':
+        replayed = asyncio.run(replay_parked(PAYMENT_CONSUMER_CONFIG['QUEUE_NAME'], limit=args.limit))
+        console_logger.info(f"Replayed {replayed} parked payment messages")
+    else:
+        uvicorn.run(app, host=PAYMENT_CONSUMER_CONFIG['HEALTH_HOST'], port=PAYMENT_CONSUMER_CONFIG['HEALTH_PORT'])
+
+
+if __name__ == "__main__":
+    main()
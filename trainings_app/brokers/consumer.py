@@ -1,15 +1,18 @@
 import asyncio
 import json
 from datetime import timedelta, datetime
+from typing import Optional
 
 import aio_pika
 import os
 import dotenv
+from asyncpg import Pool
 from pydantic import BaseModel, SecretStr
 
-from trainings_app.db.connection import AsyncpgPool
+from trainings_app.brokers.retry import RetryTopology
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.db.connection import AsyncpgPool, CONSUMER_POOL
 from trainings_app.repositories.clients import ClientRepository
-from trainings_app.schemas.clients import ClientStatusEnum
 from trainings_app.schemas.users import GetUser, RoleEnum
 from trainings_app.settings import settings
 
@@ -46,36 +49,160 @@ def get_system_user() -> GetUser:
     )
 
 
-async def resolve_dependencies():
-    pool = await AsyncpgPool.get_pool()
-    conn = await pool.acquire()
-    repo = ClientRepository(conn)
-    user = get_system_user()
-    return repo, user, conn
+PAYMENT_CONSUMER_CONFIG = {
+    'QUEUE_NAME': os.getenv('PAYMENT_CONSUMER_QUEUE_NAME', 'payment_queue'),
+    # Batches written at once, each takes a connection of the consumer pool
+    'CONCURRENCY': int(os.getenv('PAYMENT_CONSUMER_CONCURRENCY', 5)),
+    'DRAIN_TIMEOUT_SEC': float(os.getenv('PAYMENT_CONSUMER_DRAIN_TIMEOUT_SEC', 10)),
+    # The PAID events are written when the batch is full or its first event waited that long
+    'BATCH_SIZE': int(os.getenv('PAYMENT_CONSUMER_BATCH_SIZE', 100)),
+    'BATCH_WAIT_MS': int(os.getenv('PAYMENT_CONSUMER_BATCH_WAIT_MS', 50)),
+    # Turn off to consume only in the standalone process (python -m trainings_app.brokers)
+    'IN_PROCESS': os.getenv('PAYMENT_CONSUMER_IN_PROCESS', 'true').lower() == 'true',
+    # Health endpoint of the standalone process
+    'HEALTH_HOST': os.getenv('PAYMENT_CONSUMER_HEALTH_HOST', '0.0.0.0'),
+    'HEALTH_PORT': int(os.getenv('PAYMENT_CONSUMER_HEALTH_PORT', 8001)),
+}
 
+# Unacked messages the broker pushes to this consumer: enough to fill every concurrent batch
+PAYMENT_CONSUMER_CONFIG['PREFETCH_COUNT'] = int(os.getenv(
+    'PAYMENT_CONSUMER_PREFETCH_COUNT', PAYMENT_CONSUMER_CONFIG['CONCURRENCY'] * PAYMENT_CONSUMER_CONFIG['BATCH_SIZE']
+))
 
-async def process_message(message: aio_pika.IncomingMessage):
-    async with message.process():
-        repo, user, conn = await resolve_dependencies()
+MEMBERSHIP_DURATION = timedelta(days=30)
+
+
+class ActivationBatcher:
+    """
+    Collects the PAID events and activates their clients with one UPDATE per batch.
+    The messages of a batch are acked only after the UPDATE is committed and sent to the retry queues if it fails.
+    """
+
+    def __init__(self, pool: Pool, retry: RetryTopology, config: dict = PAYMENT_CONSUMER_CONFIG):
+        self.pool = pool
+        self.retry = retry
+        self.max_size = config['BATCH_SIZE']
+        self.max_wait = config['BATCH_WAIT_MS'] / 1000
+        self._semaphore = asyncio.Semaphore(config['CONCURRENCY'])
+        self._batch: list[tuple[aio_pika.abc.AbstractIncomingMessage, int, datetime]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+
+    def add(self, message: aio_pika.abc.AbstractIncomingMessage, client_id: int, expiration_date: datetime) -> None:
+        self._batch.append((message, client_id, expiration_date))
+        if len(self._batch) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        task = asyncio.create_task(self._write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list[tuple[aio_pika.abc.AbstractIncomingMessage, int, datetime]]) -> None:
+        # A client paid twice in the batch gets the latest expiration date
+        activations: dict[int, datetime] = {}
+        for _, client_id, expiration_date in batch:
+            activations[client_id] = max(expiration_date, activations.get(client_id, expiration_date))
         try:
-            data = json.loads(message.body.decode())
-            if data['status'] == 'PAID':
-                client_record = await repo.update(
-                    client_id=data['client_id'],
-                    update_data={
-                        'status': ClientStatusEnum.ACTIVE,
-                        'expiration_date': datetime.fromisoformat(data['timestamp']) + timedelta(days=30),
-                    },
-                    user=user,
-                )
-                return client_record
-        finally:
-            await conn.close()
-
-
-async def payment_consume():
-    connection = await aio_pika.connect_robust(settings.rabbitmq_payment_dsn)
-    channel = await connection.channel()
-    payment_queue = await channel.declare_queue("payment_queue", durable=True)
-    await payment_queue.consume(process_message)
-    await asyncio.Future()
+            async with self._semaphore, self.pool.acquire() as conn:
+                updated = await ClientRepository(conn).activate_many(activations)
+        except Exception as e:
+            main_logger.error(f"Payment batch Error: {e!r}")
+            for message, _, _ in batch:
+                await self.retry.retry(message, error=repr(e))
+            return
+        if missing := activations.keys() - set(updated):
+            main_logger.warning(f"Payment events for unknown clients: {sorted(missing)}")
+        for message, _, _ in batch:
+            try:
+                await message.ack()
+            except aio_pika.exceptions.AMQPError as e:
+                # The channel is gone, the broker redelivers the message anyway
+                main_logger.error(f"Payment message ack Error: {e!r}")
+
+    async def stop(self, timeout: float) -> None:
+        """Writes the collected events and waits for the running batches."""
+        self.flush()
+        if self._flushes:
+            done, pending = await asyncio.wait(self._flushes, timeout=timeout)
+            if pending:
+                main_logger.warning(f"Payment consumer stopped with {len(pending)} batches running")
+
+
+async def process_message(message: aio_pika.abc.AbstractIncomingMessage, batcher: ActivationBatcher) -> None:
+    """Hands the PAID events to the batcher, which acks them; the rest are acked right away."""
+    try:
+        data = json.loads(message.body.decode())
+        if data['status'] != 'PAID':
+            await message.ack()
+            return
+        expiration_date = datetime.fromisoformat(data['timestamp']) + MEMBERSHIP_DURATION
+        batcher.add(message, int(data['client_id']), expiration_date)
+    except (ValueError, KeyError, TypeError) as e:
+        # Fails on every delivery, no use retrying
+        await batcher.retry.park(message, error=f"Invalid payment message: {e!r}")
+
+
+class PaymentConsumer:
+    """
+    Consumes the payment events and writes them in batches.
+    The broker pushes at most prefetch_count unacked messages, so a batch can't outgrow it.
+    On stop the consumer is cancelled first, so no new messages come, and the collected batch is written.
+    """
+
+    def __init__(self, pool_name: str = CONSUMER_POOL, config: dict = PAYMENT_CONSUMER_CONFIG):
+        self.pool_name = pool_name
+        self.config = config
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._queue: Optional[aio_pika.abc.AbstractQueue] = None
+        self._consumer_tag: Optional[str] = None
+        self._batcher: Optional[ActivationBatcher] = None
+
+    @property
+    def is_consuming(self) -> bool:
+        return self._consumer_tag is not None and self._connection is not None and not self._connection.is_closed
+
+    async def _on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        try:
+            await process_message(message, self._batcher)
+        except Exception as e:
+            main_logger.error(f"Payment message Error: {e!r}")
+
+    async def start(self) -> None:
+        full_prefetch = self.config['CONCURRENCY'] * self.config['BATCH_SIZE']
+        if self.config['PREFETCH_COUNT'] < full_prefetch:
+            main_logger.warning(
+                f"Payment consumer prefetch {self.config['PREFETCH_COUNT']} is below concurrency × batch size "
+                f"{full_prefetch}, not every concurrent batch can be filled"
+            )
+        pool = await AsyncpgPool.get_pool(self.pool_name)
+        self._connection = await aio_pika.connect_robust(settings.rabbitmq_payment_dsn)
+        channel = await self._connection.channel()
+        await channel.set_qos(prefetch_count=self.config['PREFETCH_COUNT'])
+        retry = RetryTopology(channel, self.config['QUEUE_NAME'])
+        await retry.declare()
+        self._batcher = ActivationBatcher(pool, retry, self.config)
+        self._queue = await channel.declare_queue(self.config['QUEUE_NAME'], durable=True)
+        self._consumer_tag = await self._queue.consume(self._on_message)
+
+    async def stop(self) -> None:
+        """Stops taking messages and writes the collected ones; the unacked messages go back to the queue."""
+        if self._queue is not None and self._consumer_tag is not None:
+            try:
+                await self._queue.cancel(self._consumer_tag)
+            except aio_pika.exceptions.AMQPError as e:
+                main_logger.error(f"Payment consumer cancel Error: {e!r}")
+            self._consumer_tag = None
+        if self._batcher is not None:
+            await self._batcher.stop(self.config['DRAIN_TIMEOUT_SEC'])
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
@@ -0,0 +1,127 @@
+import os
+from typing import Optional
+
+import aio_pika
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.settings import settings
+
+PAYMENT_RETRY_CONFIG = {
+    # Deliveries of a message before it's parked, the first one included
+    'MAX_ATTEMPTS': int(os.getenv('PAYMENT_RETRY_MAX_ATTEMPTS', 5)),
+    # Delay before the first retry, doubled for each next one
+    'BASE_DELAY_MS': int(os.getenv('PAYMENT_RETRY_BASE_DELAY_MS', 1000)),
+    'MAX_DELAY_MS': int(os.getenv('PAYMENT_RETRY_MAX_DELAY_MS', 60_000)),
+}
+
+ATTEMPTS_HEADER = 'x-attempts'
+ERROR_HEADER = 'x-last-error'
+
+
+def retry_queue_name(queue_name: str, delay_ms: int) -> str:
+    """
+    The delay is a part of the name: the TTL of a declared queue can't change, so a new delay gets a new queue.
+    The queues of the old delays dead-letter their messages as before and can be deleted once empty.
+    """
+    return f"{queue_name}.retry.{delay_ms}ms"
+
+
+def parking_queue_name(queue_name: str) -> str:
+    return f"{queue_name}.parking"
+
+
+class RetryTopology:
+    """
+    Delays the failed messages instead of returning them to the queue at once.
+    A failed message is republished to the retry queue of its attempt delay: the queue has no consumers, so the
+    message waits there for the queue TTL and is dead-lettered back to the main queue. Every retry queue holds messages
+    with the same delay, so the expired ones are never stuck behind the longer ones.
+    After max_attempts deliveries the message goes to the parking queue, from which replay returns it.
+    """
+
+    def __init__(self, channel: aio_pika.abc.AbstractChannel, queue_name: str, config: dict = PAYMENT_RETRY_CONFIG):
+        self.channel = channel
+        self.queue_name = queue_name
+        self.max_attempts = config['MAX_ATTEMPTS']
+        self.base_delay_ms = config['BASE_DELAY_MS']
+        self.max_delay_ms = config['MAX_DELAY_MS']
+
+    def delay_ms(self, attempt: int) -> int:
+        return min(self.base_delay_ms * 2 ** (attempt - 1), self.max_delay_ms)
+
+    async def declare(self) -> None:
+        for delay_ms in sorted({self.delay_ms(attempt) for attempt in range(1, self.max_attempts)}):
+            await self.channel.declare_queue(
+                retry_queue_name(self.queue_name, delay_ms),
+                durable=True,
+                arguments={
+                    'x-message-ttl': delay_ms,
+                    'x-dead-letter-exchange': '',
+                    'x-dead-letter-routing-key': self.queue_name,
+                },
+            )
+        await self.channel.declare_queue(parking_queue_name(self.queue_name), durable=True)
+
+    async def retry(self, message: aio_pika.abc.AbstractIncomingMessage, error: str) -> None:
+        """Republishes the message to the retry queue of its attempt, or parks it if no attempts are left."""
+        attempt = int((message.headers or {}).get(ATTEMPTS_HEADER, 1))
+        if attempt >= self.max_attempts:
+            main_logger.error(f"Payment message parked after {attempt} attempts: {error}")
+            await self._move(message, parking_queue_name(self.queue_name), attempt, error)
+        else:
+            await self._move(message, retry_queue_name(self.queue_name, self.delay_ms(attempt)), attempt + 1, error)
+
+    async def park(self, message: aio_pika.abc.AbstractIncomingMessage, error: str) -> None:
+        """For the messages which fail on every delivery, e.g. the malformed ones."""
+        main_logger.error(f"Payment message parked: {error}")
+        attempt = int((message.headers or {}).get(ATTEMPTS_HEADER, 1))
+        await self._move(message, parking_queue_name(self.queue_name), attempt, error)
+
+    async def _move(self, message: aio_pika.abc.AbstractIncomingMessage, queue: str, attempt: int, error: str) -> None:
+        # The channel is in the confirm mode, so the original is acked only after the copy is stored by the broker
+        try:
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers={**(message.headers or {}), ATTEMPTS_HEADER: attempt, ERROR_HEADER: error[:255]},
+                    content_type=message.content_type,
+                    message_id=message.message_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=queue,
+            )
+            await message.ack()
+        except aio_pika.exceptions.AMQPError as e:
+            # Neither the copy nor the ack is guaranteed, the broker redelivers the original
+            main_logger.error(f"Payment message retry Error: {e!r}")
+
+    async def replay(self, limit: Optional[int] = None) -> int:
+        """Moves the parked messages back to the main queue with a fresh attempts counter, returns their number."""
+        replayed = 0
+        parking = await self.channel.declare_queue(parking_queue_name(self.queue_name), durable=True)
+        while limit is None or replayed < limit:
+            message = await parking.get(no_ack=False, fail=False)
+            if message is None:
+                break
+            headers = {
+                key: value for key, value in (message.headers or {}).items() if key not in (ATTEMPTS_HEADER, ERROR_HEADER)
+            }
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    message_id=message.message_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=self.queue_name,
+            )
+            await message.ack()
+            replayed += 1
+        return replayed
+
+
+async def replay_parked(queue_name: str, limit: Optional[int] = None) -> int:
+    connection = await aio_pika.connect_robust(settings.rabbitmq_payment_dsn)
+    async with connection:
+        return await RetryTopology(await connection.channel(), queue_name).replay(limit)
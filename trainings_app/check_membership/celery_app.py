@@ -1,26 +1,22 @@
-import json
 from contextlib import asynccontextmanager
 
 from asgiref.sync import async_to_sync
-from datetime import datetime, timezone
 from celery import Celery, schedules
 
-from trainings_app.db.connection import AsyncpgPool
+from trainings_app.check_membership.sweeper import sweep_expired_memberships
+from trainings_app.db.connection import AsyncpgPool, WORKER_POOL
 from trainings_app.settings import settings
-from trainings_app.schemas.clients import ClientStatusEnum as Statuses
 
 
 @asynccontextmanager
 async def get_conn():
-    pool = await AsyncpgPool.get_pool()
-    async with pool.acquire() as conn:
-        await conn.set_type_codec(
-            "json",
-            encoder=json.dumps,
-            decoder=json.loads,
-            schema='pg_catalog'
-        )
-        yield conn
+    # async_to_sync runs every task in a fresh event loop, so the worker pool lives for one task
+    pool = await AsyncpgPool.setup(WORKER_POOL)
+    try:
+        async with pool.acquire() as conn:
+            yield conn
+    finally:
+        await AsyncpgPool.close_pool(WORKER_POOL)
 
 
 app = Celery(
@@ -37,22 +33,13 @@ def check_membership_status():
 
 async def _check_membership_status():
     async with get_conn() as conn:
-        today_utc = datetime.now(timezone.utc)
-        update_query = f"""
-            UPDATE clients
-            SET status=$1
-            WHERE status=$2 AND expiration_date>$3
-            RETURNING id;
-        """
-
-        client_ids = await conn.fetch(update_query, Statuses.INACTIVE, Statuses.ACTIVE, today_utc)
-        return client_ids
+        return await sweep_expired_memberships(conn)
 
 
 app.conf.broker_connection_retry_on_startup = True
 app.conf.beat_schedule = {
     "check_membership": {
-        "task": 'trainings_app.check_membership.check_membership_status',
+        "task": 'trainings_app.check_membership.celery_app.check_membership_status',
         "schedule": schedules.timedelta(seconds=30),
         # "schedule": schedules.crontab(hour='3', minute='0'),
     },
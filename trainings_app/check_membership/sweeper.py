@@ -0,0 +1,78 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from asyncpg import Connection
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.repositories.clients import ClientRepository
+
+MEMBERSHIP_SWEEPER_CONFIG = {
+    # Clients deactivated per transaction, so the row locks are held briefly
+    'CHUNK_SIZE': int(os.getenv('MEMBERSHIP_SWEEPER_CHUNK_SIZE', 500)),
+    # Chunks per run, the rest is left for the next run
+    'MAX_CHUNKS': int(os.getenv('MEMBERSHIP_SWEEPER_MAX_CHUNKS', 100)),
+    # The run looks that far behind the high-water mark, for the rows skipped as locked by the previous runs
+    'LOOKBACK_SEC': int(os.getenv('MEMBERSHIP_SWEEPER_LOOKBACK_SEC', 3600)),
+    # A run that often scans from the start, for the clients activated with an expiration below the mark,
+    # e.g. by a late payment event or a manual update
+    'CATCH_UP_INTERVAL_SEC': int(os.getenv('MEMBERSHIP_SWEEPER_CATCH_UP_INTERVAL_SEC', 3600)),
+}
+
+SWEEPER_NAME = 'membership_expiry'
+CATCH_UP_NAME = 'membership_expiry_catch_up'
+
+
+async def get_high_water_mark(conn: Connection, name: str) -> Optional[datetime]:
+    query = """
+        SELECT high_water_mark FROM sweeper_watermarks WHERE name = $1;
+    """
+    return await conn.fetchval(query, name)
+
+
+async def set_high_water_mark(conn: Connection, name: str, value: datetime) -> None:
+    """Only moves the mark forward, a slower concurrent run can't move it back."""
+    query = """
+        INSERT INTO sweeper_watermarks (name, high_water_mark)
+        VALUES ($1, $2)
+        ON CONFLICT (name) DO UPDATE
+        SET high_water_mark = GREATEST(sweeper_watermarks.high_water_mark, EXCLUDED.high_water_mark),
+            updated_at = CURRENT_TIMESTAMP;
+    """
+    await conn.execute(query, name, value)
+
+
+async def sweep_expired_memberships(conn: Connection, config: dict = MEMBERSHIP_SWEEPER_CONFIG) -> list[int]:
+    """
+    Deactivates the clients expired since the last run, chunk by chunk in the order of the expiration index.
+    Every chunk commits with the high-water mark of its rows, so an interrupted run resumes where it stopped;
+    a completed run moves the mark to its start time.
+    Once per catch-up interval the run scans from the start instead: the index holds the active clients only,
+    so it reads just the expired ones the previous runs missed.
+    """
+    # expiration_date is a timestamp without time zone in UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    high_water_mark = await get_high_water_mark(conn, SWEEPER_NAME)
+    caught_up_at = await get_high_water_mark(conn, CATCH_UP_NAME)
+    catch_up = caught_up_at is None or now - caught_up_at >= timedelta(seconds=config['CATCH_UP_INTERVAL_SEC'])
+    if high_water_mark is None or catch_up:
+        after = datetime.min
+    else:
+        after = high_water_mark - timedelta(seconds=config['LOOKBACK_SEC'])
+    client_repo = ClientRepository(conn)
+
+    client_ids = []
+    for _ in range(config['MAX_CHUNKS']):
+        async with conn.transaction():
+            records = await client_repo.deactivate_expired(after=after, until=now, limit=config['CHUNK_SIZE'])
+            if records:
+                await set_high_water_mark(conn, SWEEPER_NAME, max(record['expiration_date'] for record in records))
+        client_ids.extend(record['id'] for record in records)
+        if len(records) < config['CHUNK_SIZE']:
+            await set_high_water_mark(conn, SWEEPER_NAME, now)
+            if catch_up:
+                await set_high_water_mark(conn, CATCH_UP_NAME, now)
+            break
+    else:
+        main_logger.warning(f"Membership sweeper stopped after {config['MAX_CHUNKS']} chunks, the rest is left")
+    return client_ids
@@ -1,54 +1,102 @@
-import json
 from typing import Optional, Type, Callable
 
 import asyncpg
+import orjson
 from asyncpg import Pool, Connection
 from fastapi import Depends
 
 from trainings_app.custom_loggers.main import main_logger
 from trainings_app.exceptions.exceptions import UninitializedDatabasePoolError
 from trainings_app.repositories.base import BaseRepository
+from trainings_app.repositories.identity_map import IdentityMap
 from trainings_app.settings import settings
 
+API_POOL = "api"
+CONSUMER_POOL = "consumer"
+WORKER_POOL = "worker"
+
+
+def json_dumps(value) -> str:
+    return orjson.dumps(value).decode()
+
+
+async def init_connection(conn: Connection) -> None:
+    """Register the codecs once per physical connection instead of once per request."""
+    for json_type in ("json", "jsonb"):
+        await conn.set_type_codec(
+            json_type,
+            encoder=json_dumps,
+            decoder=orjson.loads,
+            schema='pg_catalog',
+        )
+
 
 class AsyncpgPool:
-    db_pool: Optional[Pool] = None
+    """Registry of the named pools, so every workload gets its own connections."""
+    db_pools: dict[str, Pool] = {}
 
     @classmethod
-    async def setup(cls) -> None:
+    async def setup(cls, name: str = API_POOL, dsn: Optional[str] = None) -> Pool:
+        pool_settings = settings.POSTGRES_POOLS[name]
         try:
-            cls.db_pool = await asyncpg.create_pool(settings.postgres_dsn)
-        except UninitializedDatabasePoolError as e:
-            main_logger.error(f"Postgres initialisation Error: {e}")
+            cls.db_pools[name] = await asyncpg.create_pool(
+                dsn or settings.postgres_dsn,
+                min_size=pool_settings.min_size,
+                max_size=pool_settings.max_size,
+                max_inactive_connection_lifetime=pool_settings.max_inactive_connection_lifetime,
+                command_timeout=pool_settings.command_timeout,
+                server_settings={
+                    "application_name": f"trainings_app_{name}",
+                    "statement_timeout": str(pool_settings.statement_timeout_ms),
+                    "idle_in_transaction_session_timeout": str(pool_settings.idle_in_transaction_timeout_ms),
+                },
+                init=init_connection,
+            )
+        except (OSError, asyncpg.PostgresError) as e:
+            main_logger.error(f"Postgres initialisation Error [{name}]: {e}")
             raise UninitializedDatabasePoolError()
+        return cls.db_pools[name]
 
     @classmethod
-    async def get_pool(cls) -> Pool:
-        if not cls.db_pool:
+    async def get_pool(cls, name: str = API_POOL) -> Pool:
+        if name not in cls.db_pools:
             raise UninitializedDatabasePoolError()
-        return cls.db_pool
+        return cls.db_pools[name]
 
     @classmethod
-    async def close_pool(cls) -> None:
-        if not cls.db_pool:
+    async def close_pool(cls, name: str = API_POOL) -> None:
+        if name not in cls.db_pools:
             raise UninitializedDatabasePoolError()
-        await cls.db_pool.close()
+        await cls.db_pools.pop(name).close()
+
+
+async def get_api_pool() -> Pool:
+    return await AsyncpgPool.get_pool(API_POOL)
 
 
-# @asynccontextmanager
-async def get_conn(pool: Pool = Depends(AsyncpgPool.get_pool)) -> Connection:
+async def get_conn(pool: Pool = Depends(get_api_pool)) -> Connection:
     async with pool.acquire() as conn:
-        await conn.set_type_codec(
-            "json",
-            encoder=json.dumps,
-            decoder=json.loads,
-            schema='pg_catalog'
-        )
         yield conn
 
 
-def get_repo(repo_type: Type[BaseRepository]) -> Callable[[Connection], BaseRepository]:
-    def inner(conn=Depends(get_conn)) -> BaseRepository:
-        return repo_type(conn=conn)
+def get_identity_map() -> IdentityMap:
+    """A new identity map per request: FastAPI caches the dependency, so every repository of the request shares it."""
+    return IdentityMap()
+
+
+def get_repo(repo_type: Type[BaseRepository]) -> Callable[..., BaseRepository]:
+    def inner(conn=Depends(get_conn), identity_map=Depends(get_identity_map)) -> BaseRepository:
+        return repo_type(conn=conn, identity_map=identity_map)
+
+    return inner
+
+
+def get_pool_repo(repo_type: Type[BaseRepository]) -> Callable[..., BaseRepository]:
+    """
+    The repository without a leased connection, for the routes served from the in-memory caches:
+    it acquires a connection only on a cache miss, and every other query of it must go through connection().
+    """
+    def inner(pool=Depends(get_api_pool), identity_map=Depends(get_identity_map)) -> BaseRepository:
+        return repo_type(identity_map=identity_map, pool=pool)
 
     return inner
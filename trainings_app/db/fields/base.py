@@ -3,6 +3,9 @@ import abc
 
 class BaseFields(abc.ABC):
     cached_fields_str = None
+    cached_fields_set = None
+    cached_json_pairs_str = None
+    cached_json_object_str = None
 
     @classmethod
     @abc.abstractmethod
@@ -10,9 +13,55 @@ class BaseFields(abc.ABC):
         """Retrieve the list of model fields"""
         ...
 
+    @classmethod
+    @abc.abstractmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        """Retrieve the Postgres types of the model fields"""
+        ...
+
     @classmethod
     def get_fields_str(cls) -> str:
         """Retrieve the str containing the model fields"""
         if cls.cached_fields_str is None:
             cls.cached_fields_str = ', '.join(field for field in cls.get_fields_list())
         return cls.cached_fields_str
+
+    @classmethod
+    def get_fields_set(cls) -> frozenset[str]:
+        """Retrieve the set of model fields to check the column names against"""
+        if cls.cached_fields_set is None:
+            cls.cached_fields_set = frozenset(cls.get_fields_list())
+        return cls.cached_fields_set
+
+    @staticmethod
+    def json_value_str(field: str, field_type: str) -> str:
+        """
+        Retrieve the expression rendering the column as the model serializes it.
+        The numeric columns are cast to float8: the model fields are floats, so 80.50 is rendered as 80.5.
+        The timestamps get the six-digit fraction of the model or none if it's zero, Postgres trims its zeros.
+        """
+        if field_type == 'numeric':
+            return f"{field}::float8"
+        if field_type == 'timestamp':
+            return (
+                f"to_char({field}, 'YYYY-MM-DD\"T\"HH24:MI:SS') || CASE WHEN extract(microseconds FROM {field})::int "
+                f"% 1000000 = 0 THEN '' ELSE to_char({field}, '.US') END"
+            )
+        return field
+
+    @classmethod
+    def get_json_pairs_str(cls) -> str:
+        """Retrieve the key-value arguments of json_build_object in the model field order"""
+        if cls.cached_json_pairs_str is None:
+            fields_types = cls.get_fields_types()
+            cls.cached_json_pairs_str = ', '.join(
+                f"'{field}', {cls.json_value_str(field, fields_types.get(field))}" for field in cls.get_fields_list()
+            )
+        return cls.cached_json_pairs_str
+
+    @classmethod
+    def get_json_object_str(cls) -> str:
+        """Retrieve the json_build_object(...) expression rendering the row as the model JSON"""
+        if cls.cached_json_object_str is None:
+            cls.cached_json_object_str = f"json_build_object({cls.get_json_pairs_str()})"
+        return cls.cached_json_object_str
@@ -8,3 +8,20 @@ class ClientFields(BaseFields):
     def get_fields_list(cls) -> list[str]:
         return ['id', 'user_id', 'membership_id', 'first_name', 'last_name', 'phone_number', 'gender', 'date_of_birth',
                 'weight_kg', 'height_cm', 'status', 'expiration_date']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'id': 'integer',
+            'user_id': 'integer',
+            'membership_id': 'integer',
+            'first_name': 'varchar',
+            'last_name': 'varchar',
+            'phone_number': 'varchar',
+            'gender': 'gender_enum',
+            'date_of_birth': 'date',
+            'weight_kg': 'numeric',
+            'height_cm': 'numeric',
+            'status': 'client_activity_status_enum',
+            'expiration_date': 'timestamp',
+        }
@@ -7,3 +7,14 @@ class ExerciseFields(BaseFields):
     @classmethod
     def get_fields_list(cls) -> list[str]:
         return ['id', 'title', 'description', 'muscle_group', 'equipment_required', 'complexity_lvl']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'id': 'integer',
+            'title': 'varchar',
+            'description': 'text',
+            'muscle_group': 'muscle_group_enum',
+            'equipment_required': 'boolean',
+            'complexity_lvl': 'complexity_enum',
+        }
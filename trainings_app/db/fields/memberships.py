@@ -7,3 +7,12 @@ class MembershipFields(BaseFields):
     @classmethod
     def get_fields_list(cls) -> list[str]:
         return ['id', 'access_level', 'description', 'price']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'id': 'integer',
+            'access_level': 'access_level_enum',
+            'description': 'text',
+            'price': 'numeric',
+        }
@@ -7,3 +7,11 @@ class PaymentFields(BaseFields):
     @classmethod
     def get_fields_list(cls) -> list[str]:
         return ['client_id', 'membership_id', 'payment_status']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'client_id': 'integer',
+            'membership_id': 'integer',
+            'payment_status': 'payment_status_enum',
+        }
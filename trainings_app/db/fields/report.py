@@ -7,3 +7,12 @@ class ReportFields(BaseFields):
     @classmethod
     def get_fields_list(cls) -> list[str]:
         return ['id', 'report_date_start', 'report_date_end', 'new_users']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'id': 'integer',
+            'report_date_start': 'date',
+            'report_date_end': 'date',
+            'new_users': 'jsonb',
+        }
@@ -8,3 +8,16 @@ class TrainingFields(BaseFields):
     def get_fields_list(cls) -> list[str]:
         return ['id', 'client_id', 'training_type', 'title', 'intensity', 'duration_min', 'date_of_train',
                 'description']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'id': 'integer',
+            'client_id': 'integer',
+            'training_type': 'training_type_enum',
+            'title': 'varchar',
+            'intensity': 'intensity_enum',
+            'duration_min': 'integer',
+            'date_of_train': 'date',
+            'description': 'text',
+        }
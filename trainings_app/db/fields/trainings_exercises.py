@@ -8,3 +8,15 @@ class TrainingExerciseFields(BaseFields):
     def get_fields_list(cls) -> list[str]:
         return ['training_id', 'exercise_id', 'order_in_training', 'sets', 'reps', 'rest_time_sec',
                 'extra_weight']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'training_id': 'integer',
+            'exercise_id': 'integer',
+            'order_in_training': 'integer',
+            'sets': 'integer',
+            'reps': 'integer',
+            'rest_time_sec': 'integer',
+            'extra_weight': 'numeric',
+        }
@@ -7,3 +7,16 @@ class UserFields(BaseFields):
     @classmethod
     def get_fields_list(cls) -> list[str]:
         return ['id', 'username', 'password_hash', 'email', 'role', 'created_at', 'last_login', 'deleted_at']
+
+    @classmethod
+    def get_fields_types(cls) -> dict[str, str]:
+        return {
+            'id': 'integer',
+            'username': 'varchar',
+            'password_hash': 'varchar',
+            'email': 'varchar',
+            'role': 'user_role_enum',
+            'created_at': 'timestamp',
+            'last_login': 'timestamp',
+            'deleted_at': 'timestamp',
+        }
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Iterable
+
+import asyncpg
+from asyncpg import Connection
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.db_redis.reference_cache import ReferenceCache
+from trainings_app.settings import settings
+
+# Fired by the triggers of the catalog tables with the table name as the payload
+CATALOG_CHANNEL = 'catalog_changes'
+# A dropped connection is noticed by the heartbeat even if the socket gets no error
+HEARTBEAT_SEC = 10
+RECONNECT_DELAY_SEC = 1
+RECONNECT_MAX_DELAY_SEC = 30
+
+
+class CatalogListener:
+    """
+    Keeps a dedicated connection listening to the catalog changes and drops the snapshots of the changed tables.
+    The snapshots are enabled only while the connection is alive: a notification sent while the listener
+    is reconnecting would be lost, so until then the reads go to Redis and Postgres.
+    """
+
+    def __init__(self, caches: Iterable[ReferenceCache], dsn: str = None):
+        self.caches = {cache.table: cache for cache in caches}
+        self.dsn = dsn or settings.postgres_dsn
+        self._conn: Connection = None
+        self._lost = asyncio.Event()
+
+    def _on_notification(self, conn: Connection, pid: int, channel: str, table: str) -> None:
+        cache = self.caches.get(table)
+        if cache is not None:
+            cache.drop_snapshot()
+
+    def _on_termination(self, conn: Connection) -> None:
+        self._disable_snapshots()
+        self._lost.set()
+
+    def _disable_snapshots(self) -> None:
+        for cache in self.caches.values():
+            cache.disable_snapshot()
+
+    async def _listen(self) -> None:
+        self._lost.clear()
+        self._conn = await asyncpg.connect(self.dsn, server_settings={"application_name": "trainings_app_listener"})
+        self._conn.add_termination_listener(self._on_termination)
+        await self._conn.add_listener(CATALOG_CHANNEL, self._on_notification)
+        # The changes made before the LISTEN can't have been seen by a snapshot loaded after it
+        for cache in self.caches.values():
+            cache.drop_snapshot()
+            cache.enable_snapshot()
+        main_logger.info(f"Listening to {CATALOG_CHANNEL}")
+        while not self._lost.is_set():
+            try:
+                await asyncio.wait_for(self._lost.wait(), HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                await asyncio.wait_for(self._conn.execute("SELECT 1;"), HEARTBEAT_SEC)
+
+    async def run(self) -> None:
+        """Listens until cancelled, reconnecting with a growing delay."""
+        delay = RECONNECT_DELAY_SEC
+        try:
+            while True:
+                try:
+                    await self._listen()
+                    delay = RECONNECT_DELAY_SEC
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                    main_logger.error(f"Catalog listener Error: {e}")
+                self._disable_snapshots()
+                if self._conn is not None and not self._conn.is_closed():
+                    self._conn.terminate()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY_SEC)
+        finally:
+            self._disable_snapshots()
+            if self._conn is not None and not self._conn.is_closed():
+                self._conn.terminate()
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Generic, NamedTuple, Type, TypeVar
+
+import orjson
+from fastapi import status
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.db_redis.settings import redis_client
+from trainings_app.exceptions.exceptions import IdempotencyKeyError
+
+M = TypeVar('M', bound=BaseModel)
+
+IDEMPOTENCY_CONFIG = {
+    # Longer than the slowest call, including the retries, so the marker can't expire while the call runs
+    'LOCK_TTL_SEC': int(os.getenv('IDEMPOTENCY_LOCK_TTL_SEC', 60)),
+    'RESULT_TTL_SEC': int(os.getenv('IDEMPOTENCY_RESULT_TTL_SEC', 24 * 60 * 60)),
+    # How long a duplicate waits for the result of the call made by another process
+    'WAIT_TIMEOUT_SEC': float(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT_SEC', 30)),
+    'POLL_INTERVAL_SEC': float(os.getenv('IDEMPOTENCY_POLL_INTERVAL_SEC', 0.05)),
+}
+
+IN_FLIGHT = 'IN_FLIGHT'
+DONE = 'DONE'
+FAILED = 'FAILED'
+
+# Deletes the in-flight marker only if it is still ours
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class _Flight(NamedTuple):
+    fingerprint: str
+    future: asyncio.Future
+
+
+def never_retryable(error: Exception) -> bool:
+    return False
+
+
+class IdempotencyStore(Generic[M]):
+    """
+    Runs the call once per idempotency key and replays its result to the repeated requests.
+    The first request puts an in-flight marker into Redis and stores the result in its place.
+    The duplicates within the process await the same call, the ones in other processes poll Redis for the result.
+    A call failed with a retryable error, i.e. surely without effect, removes the marker, so the request can be
+    retried with the same key. Any other failure is stored as the result: the repeated requests get 502 instead of
+    repeating the call. A cancelled call leaves the marker till its TTL, its outcome is unknown:
+    the duplicates awaiting it within the process get 409.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            model: Type[M],
+            retryable: Callable[[Exception], bool] = never_retryable,
+            config: dict = IDEMPOTENCY_CONFIG,
+    ):
+        self.name = name
+        self.model = model
+        self.retryable = retryable
+        self.config = config
+        self._in_flight: dict[str, _Flight] = {}
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+
+    async def run(self, key: str, fingerprint: str, call: Callable[[], Awaitable[M]]) -> M:
+        """
+        Returns the result of the call made for the key.
+        The fingerprint identifies the request, the key can't be reused with another request.
+        """
+        redis_key = f"idempotency:{self.name}:{key}"
+        flight = self._in_flight.get(redis_key)
+        if flight is not None:
+            self._check_fingerprint(flight.fingerprint, fingerprint)
+            return await asyncio.shield(flight.future)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[redis_key] = _Flight(fingerprint, future)
+        try:
+            result = await self._run(redis_key, fingerprint, call)
+        except asyncio.CancelledError:
+            # The duplicates are not cancelled themselves, so they get an answer instead of the cancellation
+            future.set_exception(IdempotencyKeyError(
+                "The request with this Idempotency-Key was interrupted with an unknown outcome, try again later.",
+                status_code=status.HTTP_409_CONFLICT,
+            ))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # The duplicates get the error, nobody may be waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[redis_key]
+
+    @staticmethod
+    def _check_fingerprint(stored: str, fingerprint: str) -> None:
+        if stored != fingerprint:
+            raise IdempotencyKeyError(
+                "The Idempotency-Key was already used with another request.",
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+    async def _run(self, redis_key: str, fingerprint: str, call: Callable[[], Awaitable[M]]) -> M:
+        deadline = time.monotonic() + self.config['WAIT_TIMEOUT_SEC']
+        # The token makes the marker unique, so only its owner can remove it
+        marker = orjson.dumps({'state': IN_FLIGHT, 'fingerprint': fingerprint, 'token': uuid.uuid4().hex}).decode()
+        while True:
+            try:
+                if await redis_client.set(redis_key, marker, nx=True, ex=self.config['LOCK_TTL_SEC']):
+                    return await self._call(redis_key, fingerprint, marker, call)
+                stored = await redis_client.get(redis_key)
+            except RedisError as e:
+                # Without the store the duplicates can't be detected, so the call is not made
+                main_logger.error(f"Idempotency store Error: {e}")
+                raise IdempotencyKeyError(
+                    "Idempotency store is unavailable, try again later.",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+            if stored is None:
+                # The first call failed and removed its marker
+                continue
+            record = orjson.loads(stored)
+            self._check_fingerprint(record['fingerprint'], fingerprint)
+            if record['state'] == DONE:
+                return self.model.model_validate_json(record['result'])
+            if record['state'] == FAILED:
+                raise IdempotencyKeyError(
+                    f"The request with this Idempotency-Key failed with an unknown outcome: {record['error']}",
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                )
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyError(
+                    "The request with this Idempotency-Key is still in progress.",
+                    status_code=status.HTTP_409_CONFLICT,
+                )
+            await asyncio.sleep(self.config['POLL_INTERVAL_SEC'])
+
+    async def _call(self, redis_key: str, fingerprint: str, marker: str, call: Callable[[], Awaitable[M]]) -> M:
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            main_logger.warning(f"Idempotent call {redis_key} cancelled, the key is locked till the marker expires")
+            raise
+        except Exception as e:
+            if self.retryable(e):
+                try:
+                    await self._release(keys=[redis_key], args=[marker])
+                except RedisError as redis_error:
+                    main_logger.error(f"Idempotency store Error: {redis_error}")
+            else:
+                await self._store(redis_key, {'state': FAILED, 'fingerprint': fingerprint, 'error': str(e)})
+            raise
+        await self._store(redis_key, {'state': DONE, 'fingerprint': fingerprint, 'result': result.model_dump_json()})
+        return result
+
+    async def _store(self, redis_key: str, record: dict) -> None:
+        try:
+            await redis_client.set(redis_key, orjson.dumps(record).decode(), ex=self.config['RESULT_TTL_SEC'])
+        except RedisError as e:
+            # The marker expires and a retry makes the call again
+            main_logger.error(
+                f"Idempotency store Error: the {record['state']} outcome of {redis_key} is not stored, "
+                f"a retry after {self.config['LOCK_TTL_SEC']} s can repeat the call: {e}"
+            )
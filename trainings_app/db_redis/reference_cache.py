@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import os
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Awaitable, Callable, Generic, Iterable, Mapping, NamedTuple, Optional, Type, TypeVar
+
+import msgpack
+from pydantic import BaseModel
+from redis.exceptions import RedisError, WatchError
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.db_redis.settings import redis_bytes_client
+from trainings_app.utils.records import model_from_record, models_from_records
+
+M = TypeVar('M', bound=BaseModel)
+
+REFERENCE_CACHE_CONFIG = {
+    # The writes invalidate the cache explicitly, the TTL only bounds the life of an unused table
+    'TTL_SEC': int(os.getenv('REFERENCE_CACHE_TTL_SEC', 3600)),
+}
+
+# Hash field marking the table as completely loaded, so a missing row is told from a missing table.
+# Its value is the content version of the table.
+_LOADED_FIELD = b'_'
+
+
+def _pack_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Can't serialize {type(value).__name__}")
+
+
+def _pack_rows(rows: Iterable[Mapping]) -> dict[int, bytes]:
+    return {row['id']: msgpack.packb(dict(row), default=_pack_default) for row in rows}
+
+
+def _content_version(packed_rows: Mapping[int, bytes]) -> str:
+    """Hash of the packed rows ordered by ID, the same for the same content of the table."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row_id in sorted(packed_rows):
+        digest.update(packed_rows[row_id])
+    return digest.hexdigest()
+
+
+class _Table(NamedTuple):
+    rows: list[Mapping]
+    version: str
+
+
+class _Snapshot(NamedTuple):
+    models: Mapping[int, BaseModel]
+    version: str
+
+
+class ReferenceCache(Generic[M]):
+    """
+    Read-through Redis cache of a small, rarely changed table.
+    The whole table is stored as one hash of msgpack rows by ID and loaded at once on a miss.
+    A load running concurrently with a write is not stored, so the cache can't keep a row older than the write.
+    On Redis errors the rows are read from Postgres.
+
+    While the snapshot is enabled, the process also keeps the whole table in memory and serves the reads from it.
+    The snapshot has no TTL: it is enabled only while the process listens to the change notifications
+    of the table (see db/notifications.py), which drop it.
+    """
+
+    def __init__(self, table: str, model: Type[M], ttl: int = REFERENCE_CACHE_CONFIG['TTL_SEC']):
+        self.table = table
+        self.model = model
+        self.ttl = ttl
+        self.key = f"reference:{table}"
+        self.version_key = f"reference:{table}:version"
+        self._load_lock = asyncio.Lock()
+        self.snapshot_enabled = False
+        self._snapshot: Optional[_Snapshot] = None
+        self._snapshot_generation = 0
+        self._snapshot_lock = asyncio.Lock()
+
+    def enable_snapshot(self) -> None:
+        self.snapshot_enabled = True
+
+    def disable_snapshot(self) -> None:
+        self.snapshot_enabled = False
+        self.drop_snapshot()
+
+    def drop_snapshot(self) -> None:
+        """Called on a change of the table: the next read loads a new snapshot."""
+        self._snapshot = None
+        self._snapshot_generation += 1
+
+    async def _get_snapshot(self, loader: Callable[[], Awaitable[Iterable[Mapping]]]) -> Optional[_Snapshot]:
+        """
+        Returns the read-only snapshot of the table by ID and its version, or None if the snapshot is disabled.
+        It is loaded from Postgres, not from Redis: the notification comes on the commit of the change,
+        before the writer invalidates Redis. A snapshot loaded across a change is returned but not kept.
+        """
+        if self._snapshot is not None or not self.snapshot_enabled:
+            return self._snapshot
+        async with self._snapshot_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            generation = self._snapshot_generation
+            rows = list(await loader())
+            snapshot = _Snapshot(
+                models=MappingProxyType({row['id']: model_from_record(self.model, row) for row in rows}),
+                version=_content_version(_pack_rows(rows)),
+            )
+            if generation == self._snapshot_generation and self.snapshot_enabled:
+                self._snapshot = snapshot
+            return snapshot
+
+    async def get_all(self, loader: Callable[[], Awaitable[Iterable[Mapping]]]) -> list[M]:
+        """Returns all the rows ordered by ID."""
+        snapshot = await self._get_snapshot(loader)
+        if snapshot is not None:
+            return list(snapshot.models.values())
+        try:
+            rows = await redis_bytes_client.hgetall(self.key)
+        except RedisError as e:
+            main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+            return models_from_records(self.model, await loader())
+        if rows.pop(_LOADED_FIELD, None) is None:
+            return models_from_records(self.model, (await self._load(loader)).rows)
+        models = [model_from_record(self.model, msgpack.unpackb(row)) for row in rows.values()]
+        return sorted(models, key=lambda model: model.id)
+
+    async def get_version(self, loader: Callable[[], Awaitable[Iterable[Mapping]]]) -> Optional[str]:
+        """Returns the content version of the table, or None if it can't be read from the cache."""
+        snapshot = await self._get_snapshot(loader)
+        if snapshot is not None:
+            return snapshot.version
+        try:
+            version = await redis_bytes_client.hget(self.key, _LOADED_FIELD)
+        except RedisError as e:
+            main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+            return None
+        if version is None:
+            return (await self._load(loader)).version
+        return version.decode()
+
+    async def get(self, row_id: int, loader: Callable[[], Awaitable[Iterable[Mapping]]]) -> Optional[M]:
+        """Returns the row by ID or None if the table has no such row."""
+        snapshot = await self._get_snapshot(loader)
+        if snapshot is not None:
+            return snapshot.models.get(row_id)
+        try:
+            row, loaded = await redis_bytes_client.hmget(self.key, [str(row_id), _LOADED_FIELD])
+        except RedisError as e:
+            main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+            return self._find(await loader(), row_id)
+        if loaded is None:
+            return self._find((await self._load(loader)).rows, row_id)
+        return model_from_record(self.model, msgpack.unpackb(row)) if row is not None else None
+
+    async def invalidate(self) -> None:
+        """Drops the cached table, called after every write to it."""
+        self.drop_snapshot()
+        try:
+            async with redis_bytes_client.pipeline(transaction=True) as pipe:
+                await pipe.incr(self.version_key).delete(self.key).execute()
+        except RedisError as e:
+            main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+
+    async def warm(self, loader: Callable[[], Awaitable[Iterable[Mapping]]]) -> None:
+        """Loads the table unless it is already cached, called at startup."""
+        try:
+            if await redis_bytes_client.hexists(self.key, _LOADED_FIELD):
+                return
+        except RedisError as e:
+            main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+            return
+        await self._load(loader)
+
+    def _find(self, rows: Iterable[Mapping], row_id: int) -> Optional[M]:
+        for row in rows:
+            if row['id'] == row_id:
+                return model_from_record(self.model, row)
+        return None
+
+    async def _load(self, loader: Callable[[], Awaitable[Iterable[Mapping]]]) -> _Table:
+        """
+        Reads the table from Postgres and stores it.
+        Concurrent misses of the process wait for a single load instead of all querying Postgres.
+        """
+        async with self._load_lock:
+            try:
+                cached_rows = await redis_bytes_client.hgetall(self.key)
+                cached_version = cached_rows.pop(_LOADED_FIELD, None)
+                if cached_version is not None:
+                    packed_rows = {int(row_id): row for row_id, row in cached_rows.items()}
+                    rows = [msgpack.unpackb(packed_rows[row_id]) for row_id in sorted(packed_rows)]
+                    return _Table(rows=rows, version=cached_version.decode())
+                write_version = await redis_bytes_client.get(self.version_key)
+            except RedisError as e:
+                main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+                rows = list(await loader())
+                return _Table(rows=rows, version=_content_version(_pack_rows(rows)))
+            rows = list(await loader())
+            packed_rows = _pack_rows(rows)
+            table = _Table(rows=rows, version=_content_version(packed_rows))
+            mapping = {str(row_id): row for row_id, row in packed_rows.items()}
+            mapping[_LOADED_FIELD] = table.version.encode()
+            try:
+                async with redis_bytes_client.pipeline(transaction=True) as pipe:
+                    await pipe.watch(self.version_key)
+                    if await pipe.get(self.version_key) != write_version:
+                        return table
+                    pipe.multi()
+                    pipe.delete(self.key)
+                    pipe.hset(self.key, mapping=mapping)
+                    pipe.expire(self.key, self.ttl)
+                    await pipe.execute()
+            except WatchError:
+                pass
+            except RedisError as e:
+                main_logger.error(f"Reference cache Error [{self.key}]: {e}")
+            return table
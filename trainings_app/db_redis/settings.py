@@ -16,3 +16,10 @@ redis_client = redis.Redis(
     password=REDIS_CONFIG['REDIS_PASSWORD'],
     decode_responses=True,
 )
+
+# Returns raw bytes, for the values serialized with msgpack
+redis_bytes_client = redis.Redis(
+    host=REDIS_CONFIG['REDIS_HOST'],
+    port=REDIS_CONFIG['REDIS_PORT'],
+    password=REDIS_CONFIG['REDIS_PASSWORD'],
+)
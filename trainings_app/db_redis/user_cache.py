@@ -0,0 +1,58 @@
+import os
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.db_redis.settings import redis_client
+from trainings_app.schemas.users import GetUser
+from trainings_app.utils.cache import TTLCache
+
+USER_CACHE_CONFIG = {
+    # Redis entries are invalidated explicitly, the local ones of the other processes only expire
+    'REDIS_TTL_SEC': int(os.getenv('USER_CACHE_REDIS_TTL_SEC', 60)),
+    'LOCAL_TTL_SEC': float(os.getenv('USER_CACHE_LOCAL_TTL_SEC', 5)),
+    'LOCAL_MAXSIZE': int(os.getenv('USER_CACHE_LOCAL_MAXSIZE', 10_000)),
+}
+
+local_user_cache: TTLCache[GetUser] = TTLCache(
+    maxsize=USER_CACHE_CONFIG['LOCAL_MAXSIZE'],
+    ttl=USER_CACHE_CONFIG['LOCAL_TTL_SEC'],
+)
+
+
+def _user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+async def get_cached_user(user_id: int) -> Optional[GetUser]:
+    """Look the user up in the local cache, then in Redis. Returns None on a miss."""
+    user = local_user_cache.get(user_id)
+    if user is not None:
+        return user
+    try:
+        user_json = await redis_client.get(_user_key(user_id))
+    except RedisError as e:
+        main_logger.error(f"User cache Error: {e}")
+        return None
+    if user_json is None:
+        return None
+    user = GetUser.model_validate_json(user_json)
+    local_user_cache.set(user_id, user)
+    return user
+
+
+async def cache_user(user: GetUser) -> None:
+    local_user_cache.set(user.id, user)
+    try:
+        await redis_client.set(_user_key(user.id), user.model_dump_json(), ex=USER_CACHE_CONFIG['REDIS_TTL_SEC'])
+    except RedisError as e:
+        main_logger.error(f"User cache Error: {e}")
+
+
+async def invalidate_user(user_id: int) -> None:
+    local_user_cache.delete(user_id)
+    try:
+        await redis_client.delete(_user_key(user_id))
+    except RedisError as e:
+        main_logger.error(f"User cache Error: {e}")
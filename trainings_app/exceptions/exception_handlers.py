@@ -1,9 +1,21 @@
 import json
 
 from fastapi import Request, status, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
-from trainings_app.exceptions.exceptions import RecordNotFoundError, ConvertRecordError, AccessError
+from trainings_app.exceptions.exceptions import (
+    RecordNotFoundError,
+    ConvertRecordError,
+    AccessError,
+    CursorError,
+    AttrError,
+    BulkCreateError,
+    PasswordHashingBusyError,
+    PaymentServiceError,
+    PaymentServiceUnavailableError,
+    IdempotencyKeyError,
+)
 from trainings_app.custom_loggers.main import main_logger
 
 
@@ -39,7 +51,7 @@ def convert_record_handler(request: Request, exc: ConvertRecordError) -> Respons
         content={
             "error": "ConvertRecordError",
             "message": str(exc),
-            "record": exc.record,
+            "record": jsonable_encoder(exc.record),
             "error_detail": exc.error_detail,
         }
     )
@@ -55,3 +67,90 @@ def access_denied_handler(request: Request, exc: AccessError) -> Response:
             'message': str(exc.message) + ': No access to the specified user',
         }
     )
+
+
+def cursor_error_handler(request: Request, exc: CursorError) -> Response:
+    """Handler for the CursorError"""
+    main_logger.error(f"{str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={
+            'error': 'CursorError',
+            'message': str(exc),
+        }
+    )
+
+
+def attr_error_handler(request: Request, exc: AttrError) -> Response:
+    """Handler for the AttrError"""
+    main_logger.error(f"{str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={
+            'error': 'AttrError',
+            'message': str(exc),
+        }
+    )
+
+
+def bulk_create_handler(request: Request, exc: BulkCreateError) -> Response:
+    """Handler for the BulkCreateError"""
+    main_logger.error(f"{str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={
+            'error': 'BulkCreateError',
+            'message': str(exc),
+            'error_detail': exc.error_detail,
+        }
+    )
+
+
+def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusyError) -> Response:
+    """Handler for the PasswordHashingBusyError"""
+    main_logger.warning(f"{str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+        content={
+            'error': 'PasswordHashingBusyError',
+            'message': exc.message,
+        }
+    )
+
+
+def payment_service_handler(request: Request, exc: PaymentServiceError) -> Response:
+    """Handler for the PaymentServiceError"""
+    main_logger.error(f"{str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        content={
+            'error': 'PaymentServiceError',
+            'message': exc.message,
+        }
+    )
+
+
+def payment_service_unavailable_handler(request: Request, exc: PaymentServiceUnavailableError) -> Response:
+    """Handler for the PaymentServiceUnavailableError"""
+    main_logger.warning(f"{str(exc)}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(exc.retry_after)},
+        content={
+            'error': 'PaymentServiceUnavailableError',
+            'message': exc.message,
+        }
+    )
+
+
+def idempotency_key_handler(request: Request, exc: IdempotencyKeyError) -> Response:
+    """Handler for the IdempotencyKeyError"""
+    main_logger.warning(f"{str(exc)}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            'error': 'IdempotencyKeyError',
+            'message': exc.message,
+        }
+    )
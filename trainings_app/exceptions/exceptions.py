@@ -16,6 +16,13 @@ class ConvertRecordError(RepositoryError):
         super().__init__(self.record, self.error_detail, message)
 
 
+class BulkCreateError(RepositoryError):
+    def __init__(self, error_detail: str):
+        self.error_detail = error_detail
+        message = f"Bulk creation failed: {error_detail}"
+        super().__init__(message)
+
+
 class RecordNotFoundError(RepositoryError):
     def __init__(self):
         self.detail = {
@@ -33,6 +40,10 @@ class TokenError(ValueError):
     pass
 
 
+class CursorError(ValueError):
+    pass
+
+
 class AccessError(Exception):
     """Error with access to the source."""
 
@@ -41,6 +52,39 @@ class AccessError(Exception):
         super().__init__(self.message)
 
 
+class PasswordHashingBusyError(Exception):
+    def __init__(self, message="Too many password hashing requests, try again later."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class PaymentServiceError(Exception):
+    """
+    The payment service failed or returned an unexpected response.
+    request_sent is False only if the request surely didn't reach the service, so repeating it can't pay twice.
+    """
+
+    def __init__(self, message="Payment service error.", request_sent: bool = True):
+        self.message = message
+        self.request_sent = request_sent
+        super().__init__(self.message)
+
+
+class PaymentServiceUnavailableError(PaymentServiceError):
+    """The circuit of the payment service is open, the call was not made."""
+
+    def __init__(self, retry_after: int, message="Payment service is unavailable, try again later."):
+        self.retry_after = retry_after
+        super().__init__(message, request_sent=False)
+
+
+class IdempotencyKeyError(Exception):
+    def __init__(self, message: str, status_code: int):
+        self.message = message
+        self.status_code = status_code
+        super().__init__(self.message)
+
+
 class UninitializedDatabasePoolError(Exception):
     def __init__(self, message="The database connection pool has not been properly initialized."):
         self.message = message
@@ -2,9 +2,10 @@ import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
-from trainings_app.db.connection import AsyncpgPool
+from trainings_app.db.connection import AsyncpgPool, API_POOL, CONSUMER_POOL
 from trainings_app.routers import (
     users,
     clients,
@@ -20,25 +21,63 @@ from trainings_app.exceptions.exception_handlers import (
     record_not_found_handler,
     convert_record_handler,
     access_denied_handler,
+    cursor_error_handler,
+    attr_error_handler,
+    bulk_create_handler,
+    password_hashing_busy_handler,
+    payment_service_handler,
+    payment_service_unavailable_handler,
+    idempotency_key_handler,
+)
+from trainings_app.exceptions.exceptions import (
+    RecordNotFoundError,
+    ConvertRecordError,
+    AccessError,
+    CursorError,
+    AttrError,
+    BulkCreateError,
+    PasswordHashingBusyError,
+    PaymentServiceError,
+    PaymentServiceUnavailableError,
+    IdempotencyKeyError,
 )
-from trainings_app.exceptions.exceptions import RecordNotFoundError, ConvertRecordError
 from trainings_app.tg_bot.bot import start_bot
 from trainings_app.reports import routers
-from trainings_app.brokers.consumer import payment_consume
+from trainings_app.brokers.consumer import PaymentConsumer, PAYMENT_CONSUMER_CONFIG
+from trainings_app.utils.password_hashing import password_hasher
+from trainings_app.db.notifications import CatalogListener
+from trainings_app.payment_service.client import payment_service_client
+from trainings_app.repositories.exercises import ExerciseRepository, exercises_cache
+from trainings_app.repositories.memberships import MembershipRepository, memberships_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await AsyncpgPool.setup()
+    api_pool = await AsyncpgPool.setup(API_POOL)
+    async with api_pool.acquire() as conn:
+        await MembershipRepository(conn).warm_cache()
+        await ExerciseRepository(conn).warm_cache()
+    payment_service_client.start()
+    catalog_listener_task = asyncio.create_task(CatalogListener([memberships_cache, exercises_cache]).run())
     bot_task = asyncio.create_task(start_bot())
-    rabbit_task = asyncio.create_task(payment_consume())
+    payment_consumer = None
+    if PAYMENT_CONSUMER_CONFIG['IN_PROCESS']:
+        await AsyncpgPool.setup(CONSUMER_POOL)
+        payment_consumer = PaymentConsumer()
+        payment_consumer_task = asyncio.create_task(payment_consumer.start())
     yield
     bot_task.cancel()
-    rabbit_task.cancel()
-    await AsyncpgPool.close_pool()
+    if payment_consumer is not None:
+        payment_consumer_task.cancel()
+        await payment_consumer.stop()
+        await AsyncpgPool.close_pool(CONSUMER_POOL)
+    catalog_listener_task.cancel()
+    await AsyncpgPool.close_pool(API_POOL)
+    await payment_service_client.close()
+    password_hasher.shutdown()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(router=root.router)
 app.include_router(router=users.router)
@@ -55,7 +94,14 @@ app.include_router(router=jwt_auth.router)
 
 app.add_exception_handler(RecordNotFoundError, record_not_found_handler)
 app.add_exception_handler(ConvertRecordError, convert_record_handler)
-app.add_exception_handler(ConvertRecordError, access_denied_handler)
+app.add_exception_handler(AccessError, access_denied_handler)
+app.add_exception_handler(CursorError, cursor_error_handler)
+app.add_exception_handler(AttrError, attr_error_handler)
+app.add_exception_handler(BulkCreateError, bulk_create_handler)
+app.add_exception_handler(PasswordHashingBusyError, password_hashing_busy_handler)
+app.add_exception_handler(PaymentServiceError, payment_service_handler)
+app.add_exception_handler(PaymentServiceUnavailableError, payment_service_unavailable_handler)
+app.add_exception_handler(IdempotencyKeyError, idempotency_key_handler)
 
 if __name__ == "__main__":
     uvicorn.run("trainings_app.main:app")
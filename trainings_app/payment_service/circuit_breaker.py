@@ -0,0 +1,53 @@
+import time
+from enum import Enum
+
+
+class CircuitStateEnum(str, Enum):
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service: after failure_threshold consecutive failures the calls are rejected
+    for reset_timeout seconds, then a single trial call decides whether to close the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitStateEnum.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == CircuitStateEnum.CLOSED:
+            return True
+        if self.state == CircuitStateEnum.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = CircuitStateEnum.HALF_OPEN
+        if self.state == CircuitStateEnum.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def retry_after(self) -> int:
+        """Seconds until the next trial call."""
+        return max(1, round(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+    def record_success(self) -> None:
+        self.state = CircuitStateEnum.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Lets the next call be the trial, when the trial call ended without a result, e.g. was cancelled."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CircuitStateEnum.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = CircuitStateEnum.OPEN
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
@@ -0,0 +1,114 @@
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+from pydantic import ValidationError
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.exceptions.exceptions import PaymentServiceError, PaymentServiceUnavailableError
+from trainings_app.payment_service.circuit_breaker import CircuitBreaker
+from trainings_app.payment_service.settings import PAYMENT_CLIENT_CONFIG
+from trainings_app.schemas.memberships import GetMembership
+from trainings_app.schemas.payments import GetExtendedPaymentModel, GetPayment
+from trainings_app.settings import settings
+
+# Raised before the request is sent, so it can be repeated without creating the payment twice
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class PaymentServiceClient:
+    """
+    The app-lifetime client of the payment service: keeps the connections alive between the calls,
+    retries the requests that were not sent with a jittered backoff and stops calling a failing service.
+    """
+
+    def __init__(self, config: dict = PAYMENT_CLIENT_CONFIG):
+        self.config = config
+        self.breaker = CircuitBreaker(
+            failure_threshold=config['BREAKER_FAILURE_THRESHOLD'],
+            reset_timeout=config['BREAKER_RESET_TIMEOUT'],
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=self.config['CONNECT_TIMEOUT'],
+                read=self.config['READ_TIMEOUT'],
+                write=self.config['WRITE_TIMEOUT'],
+                pool=self.config['POOL_TIMEOUT'],
+            ),
+            limits=httpx.Limits(
+                max_connections=self.config['MAX_CONNECTIONS'],
+                max_keepalive_connections=self.config['MAX_KEEPALIVE_CONNECTIONS'],
+                keepalive_expiry=self.config['KEEPALIVE_EXPIRY'],
+            ),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Full jitter: a random delay up to the exponential backoff, so the retries of the workers spread out."""
+        return random.uniform(0, min(self.config['RETRY_MAX_DELAY'], self.config['RETRY_BASE_DELAY'] * 2 ** attempt))
+
+    async def _post(self, url: str, payload: dict) -> httpx.Response:
+        for attempt in range(self.config['MAX_RETRIES'] + 1):
+            try:
+                return await self._client.post(url, json=payload)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.config['MAX_RETRIES']:
+                    raise
+                main_logger.warning(f"Payment service request not sent, retrying: {e!r}")
+                await asyncio.sleep(self._retry_delay(attempt))
+
+    async def _call(self, url: str, payload: dict) -> dict:
+        if self._client is None:
+            raise PaymentServiceError("Payment service client is not started.", request_sent=False)
+        if not self.breaker.allow():
+            raise PaymentServiceUnavailableError(retry_after=self.breaker.retry_after())
+        try:
+            response = await self._post(url, payload)
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            # A timeout or a dropped connection after the request was sent may still have created the payment
+            raise PaymentServiceError(
+                f"Payment service request failed: {e!r}", request_sent=not isinstance(e, RETRYABLE_ERRORS)
+            )
+        except BaseException:
+            self.breaker.release_trial()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            raise PaymentServiceError(f"Payment service answered {response.status_code}.")
+        self.breaker.record_success()
+        if response.is_error:
+            raise PaymentServiceError(f"Payment service rejected the payment: {response.status_code} {response.text}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise PaymentServiceError(f"Invalid payment service response: {e}")
+
+    async def create_payment(self, client_id: int, membership: GetMembership) -> GetExtendedPaymentModel:
+        payload = {
+            "client_id": client_id,
+            "amount": membership.price,
+            "subscribe_type": membership.access_level.value,
+        }
+        response_data = await self._call(settings.payment_service_post_url, payload)
+        try:
+            payment = GetPayment.model_validate(response_data)
+        except ValidationError as e:
+            raise PaymentServiceError(f"Invalid payment service response: {e}")
+        payment_link = f"{settings.payment_service_pay_page}?id={payment.id}&amount={response_data['amount']}"
+        return GetExtendedPaymentModel(payment_data=payment, payment_link=payment_link)
+
+
+payment_service_client = PaymentServiceClient()
+
+
+def get_payment_service_client() -> PaymentServiceClient:
+    return payment_service_client
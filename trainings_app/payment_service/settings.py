@@ -0,0 +1,23 @@
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+PAYMENT_CLIENT_CONFIG = {
+    # Seconds
+    'CONNECT_TIMEOUT': float(os.getenv('PAYMENT_CLIENT_CONNECT_TIMEOUT', 2)),
+    'READ_TIMEOUT': float(os.getenv('PAYMENT_CLIENT_READ_TIMEOUT', 10)),
+    'WRITE_TIMEOUT': float(os.getenv('PAYMENT_CLIENT_WRITE_TIMEOUT', 5)),
+    'POOL_TIMEOUT': float(os.getenv('PAYMENT_CLIENT_POOL_TIMEOUT', 2)),
+    'MAX_CONNECTIONS': int(os.getenv('PAYMENT_CLIENT_MAX_CONNECTIONS', 100)),
+    'MAX_KEEPALIVE_CONNECTIONS': int(os.getenv('PAYMENT_CLIENT_MAX_KEEPALIVE_CONNECTIONS', 20)),
+    'KEEPALIVE_EXPIRY': float(os.getenv('PAYMENT_CLIENT_KEEPALIVE_EXPIRY', 30)),
+    # Only the requests that did not reach the service are retried, a payment is never created twice
+    'MAX_RETRIES': int(os.getenv('PAYMENT_CLIENT_MAX_RETRIES', 2)),
+    'RETRY_BASE_DELAY': float(os.getenv('PAYMENT_CLIENT_RETRY_BASE_DELAY', 0.1)),
+    'RETRY_MAX_DELAY': float(os.getenv('PAYMENT_CLIENT_RETRY_MAX_DELAY', 1)),
+    # Consecutive failed calls opening the circuit, and the seconds before a trial call
+    'BREAKER_FAILURE_THRESHOLD': int(os.getenv('PAYMENT_CLIENT_BREAKER_FAILURE_THRESHOLD', 5)),
+    'BREAKER_RESET_TIMEOUT': float(os.getenv('PAYMENT_CLIENT_BREAKER_RESET_TIMEOUT', 30)),
+}
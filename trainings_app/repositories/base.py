@@ -1,14 +1,68 @@
 import abc
-from asyncpg import Connection
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Sequence
+
+import asyncpg
+from asyncpg import Connection, Pool, Record
 
 from trainings_app.custom_loggers.repositories import repo_logger
-from trainings_app.exceptions.exceptions import AttrError, RecordNotFoundError
+from trainings_app.exceptions.exceptions import AttrError, RecordNotFoundError, BulkCreateError
+from trainings_app.repositories.identity_map import IdentityMap
+from trainings_app.repositories.queries import (
+    insert_query, insert_many_query, get_query, update_query, list_query,
+)
+
+EXPORT_CONFIG = {
+    # The export transaction waits for the client between the fetches, so the pool idle limit doesn't apply to it;
+    # 0 keeps it open until the stream ends or the client disconnects
+    'IDLE_IN_TRANSACTION_TIMEOUT_MS': int(os.getenv('EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS', 0)),
+    # Per statement: the first fetch of a sorted query may run the whole sort
+    'STATEMENT_TIMEOUT_MS': int(os.getenv('EXPORT_STATEMENT_TIMEOUT_MS', 300_000)),
+}
 
 
 class BaseRepository(abc.ABC):
+    table: str = None
+    pk_fields: tuple[str, ...] = ('id',)
 
-    def __init__(self, conn: Connection):
+    def __init__(
+            self,
+            conn: Optional[Connection] = None,
+            identity_map: Optional[IdentityMap] = None,
+            pool: Optional[Pool] = None,
+    ):
         self.conn = conn
+        self.identity_map = identity_map
+        self.pool = pool
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Connection]:
+        """
+        Yields the connection of the repository, or acquires one from the pool for a repository created without it.
+        So a repository on the pool leases a connection only when a read misses the in-memory caches.
+        """
+        if self.conn is not None:
+            yield self.conn
+            return
+        async with self.pool.acquire() as conn:
+            yield conn
+
+    def lookup(self, *key) -> Optional[Any]:
+        """Returns the model already loaded by the primary key within the request, if any."""
+        if self.identity_map is None:
+            return None
+        return self.identity_map.get(self.table, key)
+
+    def remember(self, model: Any, *key) -> Any:
+        """Stores the loaded or written model by the primary key and returns it."""
+        if self.identity_map is not None:
+            self.identity_map.add(self.table, key, model)
+        return model
+
+    def forget(self, *key) -> None:
+        if self.identity_map is not None:
+            self.identity_map.discard(self.table, key)
 
     async def fetchrow_or_404(self, query: str, *args) -> dict:
         """Check for data retrieval. If no data is found, raise a 404 error."""
@@ -19,30 +73,138 @@ class BaseRepository(abc.ABC):
             raise RecordNotFoundError()
         return record
 
-    @staticmethod
-    def data_from_dict(dct: dict) -> tuple:
-        """Returns lists of params for processing"""
+    async def fetch_json_or_404(self, query: str, *args) -> str:
+        """Fetch the JSON text rendered by Postgres. If no data is found, raise a 404 error."""
+
+        json_text = await self.conn.fetchval(query, *args)
+        if json_text is None:
+            repo_logger.error(f"The fetch_json_or_404 Error. No record found for the query.")
+            raise RecordNotFoundError()
+        return json_text
+
+    async def fetch_version_or_404(self, *key_values, columns: Sequence[str] = ()) -> Record:
+        """
+        Fetch only the version of the row by the primary key, with the extra columns.
+        The version is the xmin of the row: the ID of the transaction that wrote it, so every update changes it.
+        """
+
+        query = get_query(self.table, self.pk_fields, ', '.join(('xmin::text AS version', *columns)))
+        return await self.fetchrow_or_404(query, *key_values)
+
+    async def fetch_with_version_or_404(self, *key_values) -> tuple[dict, str]:
+        """Fetch the row by the primary key and its version with one query."""
+
+        query = get_query(self.table, self.pk_fields, f"{self.fields.get_fields_str()}, xmin::text AS version")
+        record = dict(await self.fetchrow_or_404(query, *key_values))
+        return record, record.pop('version')
+
+    async def fetch_json_with_version_or_404(self, *key_values) -> tuple[str, str]:
+        """Fetch the row rendered to JSON text by Postgres and its version with one query."""
+
+        returning = f"{self.fields.get_json_object_str()}::text AS json, xmin::text AS version"
+        record = await self.fetchrow_or_404(get_query(self.table, self.pk_fields, returning), *key_values)
+        return record['json'], record['version']
+
+    async def get_json_list(
+            self,
+            filters: Optional[dict] = None,
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+    ) -> list[Record]:
+        """Fetch the page of the primary keys and the rows rendered to JSON text by Postgres."""
+
+        returning = f"{', '.join(self.pk_fields)}, {self.fields.get_json_object_str()}::text AS json"
+        query, values = self.make_list_query(filters, limit=limit, after=after, returning=returning)
+        async with self.connection() as conn:
+            return await conn.fetch(query, *values)
+
+    async def iter_records(self, query: str, *args, prefetch: int = 500) -> AsyncIterator[Record]:
+        """
+        Iterate over the query result with a server-side cursor, fetching prefetch rows per round trip.
+        The transaction gets the export timeouts instead of the pool ones: a slow client keeps it idle between the fetches.
+        """
+
+        async with self.conn.transaction(readonly=True):
+            await self.conn.execute(
+                f"SET LOCAL idle_in_transaction_session_timeout = {EXPORT_CONFIG['IDLE_IN_TRANSACTION_TIMEOUT_MS']};"
+                f"SET LOCAL statement_timeout = {EXPORT_CONFIG['STATEMENT_TIMEOUT_MS']};"
+            )
+            async for record in self.conn.cursor(query, *args, prefetch=prefetch):
+                yield record
+
+    async def insert_many(self, rows: list[dict], unique_fields: Sequence[str]) -> list[Optional[Record]]:
+        """
+        Insert the rows with one INSERT ... SELECT FROM unnest(...) statement.
+        Rows conflicting with existing records or with previous rows of the batch are skipped.
+        Returns the created record for each passed row, or None if the row was skipped.
+        """
+
+        if not rows:
+            return []
+        columns, _ = self.columns_and_values(rows[0])
+        fields_types = self.fields.get_fields_types()
+        query = insert_many_query(
+            self.table, columns, tuple(fields_types[column] for column in columns), self.fields.get_fields_str(),
+        )
+        arrays = [[row[column] for row in rows] for column in columns]
+        try:
+            records = await self.conn.fetch(query, *arrays)
+        except asyncpg.IntegrityConstraintViolationError as e:
+            repo_logger.error(f"The insert_many Error. {e}")
+            raise BulkCreateError(str(e))
+        created = {tuple(record[field] for field in unique_fields): record for record in records}
+        return [created.pop(tuple(row[field] for field in unique_fields), None) for row in rows]
+
+    def columns_and_values(self, dct: dict) -> tuple[tuple[str, ...], list]:
+        """
+        Returns the sorted column names and their values.
+        The columns are checked against the fields list, so a request can't inject a column name into the query.
+        """
 
         if not isinstance(dct, dict):
-            repo_logger.error(f"The data_from_dict Error. Invalid type of passed argument. The required type is Dict.")
+            repo_logger.error(f"The columns_and_values Error. Invalid type of passed argument. The required type is Dict.")
             raise AttrError(f"Invalid type of passed argument. The required type is Dict.")
+        columns = tuple(sorted(dct))
+        unknown_columns = set(columns) - self.fields.get_fields_set()
+        if unknown_columns:
+            repo_logger.error(f"The columns_and_values Error. Unknown columns: {unknown_columns}")
+            raise AttrError(f"Unknown columns of the {self.table} table: {', '.join(sorted(unknown_columns))}")
+        return columns, [dct[column] for column in columns]
+
+    def make_insert_query(self, data: dict) -> tuple[str, list]:
+        """Returns the cached INSERT ... RETURNING statement for the data columns and its values."""
+        columns, values = self.columns_and_values(data)
+        return insert_query(self.table, columns, self.fields.get_fields_str()), values
+
+    def make_update_query(self, data: dict, *key_values, condition: str = '') -> tuple[str, list]:
+        """
+        Returns the cached UPDATE ... RETURNING statement for the data columns and its values.
+        The record is found by the primary key values and the optional extra condition.
+        """
+        columns, values = self.columns_and_values(data)
+        query = update_query(self.table, columns, self.pk_fields, self.fields.get_fields_str(), condition)
+        return query, [*values, *key_values]
 
-        keys = []
-        values = []
-        indexes = []
-        counter = 0
-        for k, v in dct.items():
-            keys.append(k)
-            values.append(v)
-            counter += 1
-            indexes.append(counter)
-        return keys, values, indexes
-
-    @staticmethod
-    def make_set_clause(keys: list, indexes: list) -> str:
-        """Construct the lists of keys and indexes into a string for the SET clause."""
-        set_clause = ", ".join([f"{key} = ${idx}" for key, idx in zip(keys, indexes)])
-        return set_clause
+    def make_list_query(
+            self,
+            filters: Optional[dict] = None,
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+            returning: Optional[str] = None,
+    ) -> tuple[str, list]:
+        """
+        Returns the cached SELECT statement filtered by the filters and paginated by the primary key.
+        Selects all the fields unless the returning expressions are passed.
+        """
+        columns, values = self.columns_and_values(filters or {})
+        query = list_query(
+            self.table, returning or self.fields.get_fields_str(), columns, self.pk_fields, bool(after), bool(limit),
+        )
+        if after:
+            values.extend(after)
+        if limit:
+            values.append(limit)
+        return query, values
 
     @abc.abstractmethod
     async def get(self, *args, **kwargs):
@@ -1,16 +1,20 @@
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Optional
 
+from asyncpg import Record
 from pydantic import ValidationError
 
 from trainings_app.repositories.base import BaseRepository
-from trainings_app.schemas.clients import GetClient
-from trainings_app.exceptions.exceptions import ConvertRecordError, AccessError
+from trainings_app.schemas.clients import GetClient, ClientStatusEnum
+from trainings_app.exceptions.exceptions import ConvertRecordError, AccessError, RecordNotFoundError
 from trainings_app.custom_loggers.repositories import repo_logger
+from trainings_app.utils.records import model_from_record, models_from_records
 from trainings_app.db.fields.clients import ClientFields
 from trainings_app.schemas.users import GetUser, RoleEnum
 
 
 class ClientRepository(BaseRepository):
+    table = 'clients'
     fields = ClientFields
 
     @staticmethod
@@ -20,76 +24,136 @@ class ClientRepository(BaseRepository):
         if not record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=record, error_detail="No record found to convert")
-        try:
-            return GetClient(**record)
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=record, error_detail=f"{str(e)}")
-
-    async def __check_client_access(self, client_id: int, user: GetUser) -> None:
-        client = await self.get(client_id)
-        if client.user_id != user.id and user.role == RoleEnum.USER:
+        return model_from_record(GetClient, record)
+
+    @staticmethod
+    def __access_condition(user: GetUser, index: int) -> tuple[str, list]:
+        """
+        Returns the ownership condition of the write and its values, the placeholders start from the index.
+        The users with the USER role can only change their own clients.
+        """
+        return f"(user_id = ${index} OR ${index + 1})", [user.id, user.role != RoleEnum.USER]
+
+    async def __raise_not_found_or_forbidden(self, client_id: int) -> None:
+        """Called when the access-checked write matched no row: tells the missing client from the foreign one."""
+        query = """
+            SELECT EXISTS(SELECT 1 FROM clients WHERE id = $1);
+        """
+        if await self.conn.fetchval(query, client_id):
+            repo_logger.error(f"No access to the client {client_id}")
             raise AccessError
+        repo_logger.error(f"The client {client_id} not found")
+        raise RecordNotFoundError()
 
     async def create(self, client: dict) -> GetClient:
-        keys, values, indexes = self.data_from_dict(client)
-        values_clause = ', '.join([f'${i}' for i in indexes])
-        query = f"""
-                INSERT INTO clients ({', '.join(keys)})
-                VALUES ({values_clause})
-                RETURNING {self.fields.get_fields_str()};
-            """
+        query, values = self.make_insert_query(client)
         client_record = await self.fetchrow_or_404(query, *values)
         return self.__get_client_from_record(client_record)
 
+    async def create_many(self, clients: list[dict]) -> list[Optional[GetClient]]:
+        client_records = await self.insert_many(clients, unique_fields=('user_id',))
+        return [self.__get_client_from_record(record) if record else None for record in client_records]
+
     async def get(self, client_id: int) -> GetClient:
+        if (model := self.lookup(client_id)) is not None:
+            return model
         query = f"""
             SELECT {self.fields.get_fields_str()} 
             FROM clients 
             WHERE id = $1;
         """
         client_record = await self.fetchrow_or_404(query, client_id)
-        return self.__get_client_from_record(client_record)
+        return self.remember(self.__get_client_from_record(client_record), client_id)
 
-    async def get_clients(self, filter_params: Optional[dict] = None) -> list[GetClient]:
-        query = f"""
-            SELECT {self.fields.get_fields_str()}
-            FROM clients
-        """
-        values = []
-        if filter_params:
-            keys, values, indexes = self.data_from_dict(filter_params)
-            where_clause = ' AND '.join([f"{k} = ${i}" for k, i in zip(keys, indexes)])
-            query += f"""
-                WHERE {where_clause}
-            """
-        query += ';'
+    async def get_with_version(self, client_id: int) -> tuple[GetClient, str]:
+        record, version = await self.fetch_with_version_or_404(client_id)
+        return self.remember(self.__get_client_from_record(record), client_id), version
+
+    async def get_version(self, client_id: int) -> Record:
+        """Returns the version of the client with its user_id, to check the access before answering 304."""
+        return await self.fetch_version_or_404(client_id, columns=('user_id',))
+
+    async def get_clients(
+            self,
+            filter_params: Optional[dict] = None,
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+    ) -> list[GetClient]:
+        query, values = self.make_list_query(filter_params, limit=limit, after=after)
         clients_data = await self.conn.fetch(query, *values)
-        return [GetClient(**client) for client in clients_data]
+        return models_from_records(GetClient, clients_data)
+
+    def iter_clients(self, filter_params: Optional[dict] = None) -> AsyncIterator[Record]:
+        query, values = self.make_list_query(filter_params)
+        return self.iter_records(query, *values)
 
     async def delete(self, client_id: int, user: GetUser) -> GetClient:
-        await self.__check_client_access(client_id=client_id, user=user)
+        condition, access_values = self.__access_condition(user, index=2)
         query = f"""
             DELETE FROM clients
-            WHERE id = $1
+            WHERE id = $1 AND {condition}
             RETURNING {self.fields.get_fields_str()};
         """
-        deleted_client = await self.fetchrow_or_404(query, client_id)
+        deleted_client = await self.conn.fetchrow(query, client_id, *access_values)
+        if not deleted_client:
+            await self.__raise_not_found_or_forbidden(client_id)
+        self.forget(client_id)
         return self.__get_client_from_record(deleted_client)
 
     async def update(self, client_id: int, update_data: dict, user: GetUser) -> GetClient:
-        await self.__check_client_access(client_id=client_id, user=user)
-        keys, values, indexes = self.data_from_dict(update_data)
-        if not values:
+        if not update_data:
             repo_logger.error(f"Invalid update data")
             raise ValidationError("Invalid update data")
-        values.append(client_id)
-        set_clause = self.make_set_clause(keys=keys, indexes=indexes)
+        condition, access_values = self.__access_condition(user, index=len(update_data) + len(self.pk_fields) + 1)
+        query, values = self.make_update_query(update_data, client_id, condition=condition)
+        updated_client = await self.conn.fetchrow(query, *values, *access_values)
+        if not updated_client:
+            await self.__raise_not_found_or_forbidden(client_id)
+        return self.remember(self.__get_client_from_record(updated_client), client_id)
+
+    async def activate_many(self, activations: dict[int, datetime]) -> list[int]:
+        """
+        Activates the clients till the given expiration dates with a single statement, without the access check:
+        called by the system only. Returns the IDs of the updated clients, the missing ones are skipped.
+        """
+        if not activations:
+            return []
+        query = """
+            UPDATE clients AS c
+            SET status = $3, expiration_date = a.expiration_date
+            FROM unnest($1::int[], $2::timestamp[]) AS a(id, expiration_date)
+            WHERE c.id = a.id
+            RETURNING c.id;
+        """
+        records = await self.conn.fetch(
+            query, list(activations.keys()), list(activations.values()), ClientStatusEnum.ACTIVE.value
+        )
+        for client_id in activations:
+            self.forget(client_id)
+        return [record['id'] for record in records]
+
+    async def deactivate_expired(self, after: datetime, until: datetime, limit: int) -> list[Record]:
+        """
+        Deactivates up to limit clients expired in (after, until], the earliest first, and returns their IDs with the
+        expiration dates. The rows locked by another transaction are skipped, so the call never waits for a lock.
+        The status is a literal to match the partial index on the active clients.
+        """
         query = f"""
-            UPDATE clients
-            SET {set_clause}
-            WHERE id = ${len(values)}
-            RETURNING {self.fields.get_fields_str()};
+            WITH expired AS (
+                SELECT id
+                FROM clients
+                WHERE status = '{ClientStatusEnum.ACTIVE.value}' AND expiration_date > $1 AND expiration_date <= $2
+                ORDER BY expiration_date
+                LIMIT $3
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE clients AS c
+            SET status = '{ClientStatusEnum.INACTIVE.value}'
+            FROM expired
+            WHERE c.id = expired.id
+            RETURNING c.id, c.expiration_date;
         """
-        updated_client = await self.fetchrow_or_404(query, *values)
-        return self.__get_client_from_record(updated_client)
+        records = await self.conn.fetch(query, after, until, limit)
+        for record in records:
+            self.forget(record['id'])
+        return records
@@ -1,14 +1,20 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
+from asyncpg import Record
 from pydantic import ValidationError
 
 from trainings_app.db.fields.exercises import ExerciseFields
+from trainings_app.db_redis.reference_cache import ReferenceCache
 from trainings_app.repositories.base import BaseRepository
 from trainings_app.schemas.exercises import CreateExercise, GetExercise
 from trainings_app.custom_loggers.repositories import repo_logger
-from trainings_app.exceptions.exceptions import ConvertRecordError
+from trainings_app.utils.records import model_from_record
+from trainings_app.exceptions.exceptions import ConvertRecordError, RecordNotFoundError
+
+exercises_cache: ReferenceCache[GetExercise] = ReferenceCache('exercises', GetExercise)
 
 
 class ExerciseRepository(BaseRepository):
+    table = 'exercises'
     fields = ExerciseFields
 
     @staticmethod
@@ -17,46 +23,65 @@ class ExerciseRepository(BaseRepository):
         if not record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=record, error_detail="No record found to convert")
-        try:
-            return GetExercise(**record)
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=record, error_detail=f"{str(e)}")
+        return model_from_record(GetExercise, record)
 
     async def create(self, arg: dict) -> GetExercise:
-        keys, values, indexes = self.data_from_dict(arg)
-        query = f"""
-            INSERT INTO exercises ({', '.join(keys)})
-            VALUES ({', '.join([f"${i}" for i in indexes])})
-            RETURNING {self.fields.get_fields_str()};
-        """
+        query, values = self.make_insert_query(arg)
         record = await self.fetchrow_or_404(query, *values)
+        await exercises_cache.invalidate()
         return self.__get_exercise_from_record(record)
 
+    async def create_many(self, args: list[dict]) -> list[Optional[GetExercise]]:
+        records = await self.insert_many(args, unique_fields=('title',))
+        await exercises_cache.invalidate()
+        return [self.__get_exercise_from_record(record) if record else None for record in records]
+
     async def get(self, exercise_id: int) -> GetExercise:
-        query = f"""
-            SELECT {self.fields.get_fields_str()}
-            FROM exercises
-            WHERE id = $1;
-        """
-        record = await self.fetchrow_or_404(query, exercise_id)
-        return self.__get_exercise_from_record(record)
+        if (model := self.lookup(exercise_id)) is not None:
+            return model
+        exercise = await exercises_cache.get(exercise_id, self.__fetch_all)
+        if exercise is None:
+            repo_logger.error(f"The exercise {exercise_id} not found")
+            raise RecordNotFoundError()
+        return self.remember(exercise, exercise_id)
 
-    async def get_exercises(self, filters: Optional[dict]) -> list[GetExercise]:
-        values = []
+    async def __fetch_all(self) -> list[Record]:
         query = f"""
             SELECT {self.fields.get_fields_str()}
             FROM exercises
+            ORDER BY id;
         """
-        if filters:
-            keys, values, indexes = self.data_from_dict(filters)
-            where_clause = ' AND '.join(f"{k} = ${i}" for k, i in zip(keys, indexes))
-            query += f"""
-                WHERE {where_clause}
-            """
-        query += ";"
-        records = await self.conn.fetch(query, *values)
-        return [GetExercise(**record) for record in records]
+        async with self.connection() as conn:
+            return await conn.fetch(query)
+
+    async def warm_cache(self) -> None:
+        await exercises_cache.warm(self.__fetch_all)
+
+    async def get_catalog_version(self) -> Optional[str]:
+        """Returns the content version of the whole catalog from the cache, None if the cache is unavailable."""
+        return await exercises_cache.get_version(self.__fetch_all)
+
+    async def get_exercises(
+            self,
+            filters: Optional[dict],
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+    ) -> list[GetExercise]:
+        """Filters and pages the cached catalog the same way as the list query does."""
+        columns, values = self.columns_and_values(filters or {})
+        exercises = await exercises_cache.get_all(self.__fetch_all)
+        if columns:
+            exercises = [
+                exercise for exercise in exercises
+                if all(getattr(exercise, column) == value for column, value in zip(columns, values))
+            ]
+        if after:
+            exercises = [exercise for exercise in exercises if exercise.id > after[0]]
+        return exercises[:limit] if limit else exercises
+
+    def iter_exercises(self, filters: Optional[dict] = None) -> AsyncIterator[Record]:
+        query, values = self.make_list_query(filters)
+        return self.iter_records(query, *values)
 
     async def delete(self, exercise_id: int) -> GetExercise:
         query = f"""
@@ -65,20 +90,15 @@ class ExerciseRepository(BaseRepository):
             RETURNING {self.fields.get_fields_str()};
         """
         record = await self.fetchrow_or_404(query, exercise_id)
+        await exercises_cache.invalidate()
+        self.forget(exercise_id)
         return self.__get_exercise_from_record(record)
 
     async def update(self, exercise_id: int, update_data: dict) -> GetExercise:
-        keys, values, indexes = self.data_from_dict(update_data)
-        if not values:
+        if not update_data:
             repo_logger.error(f"Invalid update data")
             raise ValidationError("Invalid update data")
-        values.append(exercise_id)
-        set_clause = ', '.join([f"{k} = ${i}" for k, i in zip(keys, indexes)])
-        query = f"""
-            UPDATE exercises
-            SET {set_clause}
-            WHERE id = ${len(values)}
-            RETURNING {self.fields.get_fields_str()};
-        """
+        query, values = self.make_update_query(update_data, exercise_id)
         record = await self.fetchrow_or_404(query, *values)
-        return self.__get_exercise_from_record(record)
+        await exercises_cache.invalidate()
+        return self.remember(self.__get_exercise_from_record(record), exercise_id)
@@ -0,0 +1,21 @@
+from typing import Any, Hashable, Optional
+
+
+class IdentityMap:
+    """
+    The models loaded by the primary key within one request, shared by all the repositories of the request.
+    Repeated reads of the same row are served from it, the writes refresh or drop the stored model.
+    """
+
+    def __init__(self):
+        self._models: dict[tuple[str, tuple], Any] = {}
+
+    def get(self, table: str, key: tuple[Hashable, ...]) -> Optional[Any]:
+        return self._models.get((table, key))
+
+    def add(self, table: str, key: tuple[Hashable, ...], model: Any) -> Any:
+        self._models[(table, key)] = model
+        return model
+
+    def discard(self, table: str, key: tuple[Hashable, ...]) -> None:
+        self._models.pop((table, key), None)
@@ -1,14 +1,21 @@
 from typing import Optional
+
+from asyncpg import Record
 from pydantic import ValidationError
 
 from trainings_app.db.fields.memberships import MembershipFields
+from trainings_app.db_redis.reference_cache import ReferenceCache
 from trainings_app.schemas.memberships import CreateMembership, GetMembership
 from trainings_app.repositories.base import BaseRepository
-from trainings_app.exceptions.exceptions import ConvertRecordError
+from trainings_app.exceptions.exceptions import ConvertRecordError, RecordNotFoundError
 from trainings_app.custom_loggers.repositories import repo_logger
+from trainings_app.utils.records import model_from_record
+
+memberships_cache: ReferenceCache[GetMembership] = ReferenceCache('memberships', GetMembership)
 
 
 class MembershipRepository(BaseRepository):
+    table = 'memberships'
     fields = MembershipFields
 
     @staticmethod
@@ -18,59 +25,49 @@ class MembershipRepository(BaseRepository):
         if not record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=record, error_detail="No record found to convert")
-        try:
-            return GetMembership(**record)
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=record, error_detail=f"{str(e)}")
+        return model_from_record(GetMembership, record)
 
     async def create(self, arg: dict) -> GetMembership:
-        keys, values, indexes = self.data_from_dict(arg)
-        query = f"""
-            INSERT INTO memberships ({', '.join(keys)})
-            VALUES ({', '.join([f'${i}' for i in indexes])})
-            RETURNING {self.fields.get_fields_str()};
-        """
+        query, values = self.make_insert_query(arg)
         record = await self.fetchrow_or_404(query, *values)
+        await memberships_cache.invalidate()
         return self.__get_membership_from_record(record)
 
-    async def get_memberships(self, access_level: Optional[str] = None) -> list[GetMembership]:
+    async def __fetch_all(self) -> list[Record]:
         query = f"""
             SELECT {self.fields.get_fields_str()}
             FROM memberships
+            ORDER BY id;
         """
-        params = []
+        async with self.connection() as conn:
+            return await conn.fetch(query)
+
+    async def warm_cache(self) -> None:
+        await memberships_cache.warm(self.__fetch_all)
+
+    async def get_memberships(self, access_level: Optional[str] = None) -> list[GetMembership]:
+        memberships = await memberships_cache.get_all(self.__fetch_all)
         if access_level:
-            query += " WHERE access_level = $1"
-            params.append(access_level)
-        query += ";"
-        records = await self.conn.fetch(query, *params)
-        return [GetMembership(**record) for record in records]
+            return [membership for membership in memberships if membership.access_level == access_level]
+        return memberships
 
     async def get(self, membership_id: int) -> GetMembership:
-        query = f"""
-            SELECT {self.fields.get_fields_str()}
-            FROM memberships
-            WHERE id = $1;
-        """
-        record = await self.fetchrow_or_404(query, membership_id)
-        return self.__get_membership_from_record(record)
+        if (model := self.lookup(membership_id)) is not None:
+            return model
+        membership = await memberships_cache.get(membership_id, self.__fetch_all)
+        if membership is None:
+            repo_logger.error(f"The membership {membership_id} not found")
+            raise RecordNotFoundError()
+        return self.remember(membership, membership_id)
 
     async def update(self, membership_id: int, update_data: dict) -> GetMembership:
-        keys, values, indexes = self.data_from_dict(update_data)
-        if not values:
+        if not update_data:
             repo_logger.error(f"Invalid update data")
             raise ValidationError("Invalid update data")
-        values.append(membership_id)
-        set_clause = self.make_set_clause(keys=keys, indexes=indexes)
-        query = f"""
-            UPDATE memberships
-            SET {set_clause}
-            WHERE id = ${len(indexes) + 1}
-            RETURNING {self.fields.get_fields_str()};
-        """
+        query, values = self.make_update_query(update_data, membership_id)
         record = await self.fetchrow_or_404(query, *values)
-        return self.__get_membership_from_record(record)
+        await memberships_cache.invalidate()
+        return self.remember(self.__get_membership_from_record(record), membership_id)
 
     async def delete(self, membership_id: int):
         query = f"""
@@ -79,4 +76,6 @@ class MembershipRepository(BaseRepository):
             RETURNING {self.fields.get_fields_str()};
         """
         record = await self.fetchrow_or_404(query, membership_id)
+        await memberships_cache.invalidate()
+        self.forget(membership_id)
         return self.__get_membership_from_record(record)
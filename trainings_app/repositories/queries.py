@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+QUERY_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def insert_query(table: str, columns: tuple[str, ...], returning: str) -> str:
+    """Build the INSERT statement for the columns once, so asyncpg gets the same text for the same column set."""
+    placeholders = ', '.join(f'${i}' for i in range(1, len(columns) + 1))
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({placeholders})
+        RETURNING {returning};
+    """
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def insert_many_query(table: str, columns: tuple[str, ...], types: tuple[str, ...], returning: str) -> str:
+    """Build the INSERT statement taking one array per column, rows conflicting with existing records are skipped."""
+    unnest_clause = ', '.join(f"${i}::{column_type}[]" for i, column_type in enumerate(types, 1))
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        SELECT * FROM unnest({unnest_clause})
+        ON CONFLICT DO NOTHING
+        RETURNING {returning};
+    """
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def get_query(table: str, key_fields: tuple[str, ...], returning: str) -> str:
+    """Build the SELECT statement of the row by the key fields."""
+    where_clause = ' AND '.join(f"{field} = ${i}" for i, field in enumerate(key_fields, 1))
+    return f"""
+        SELECT {returning}
+        FROM {table}
+        WHERE {where_clause};
+    """
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def update_query(
+        table: str,
+        columns: tuple[str, ...],
+        key_fields: tuple[str, ...],
+        returning: str,
+        condition: str = '',
+) -> str:
+    """Build the UPDATE statement of the columns by the key fields, the key values follow the column values."""
+    set_clause = ', '.join(f"{column} = ${i}" for i, column in enumerate(columns, 1))
+    where_clause = ' AND '.join(f"{field} = ${i}" for i, field in enumerate(key_fields, len(columns) + 1))
+    if condition:
+        where_clause += f" AND {condition}"
+    return f"""
+        UPDATE {table}
+        SET {set_clause}
+        WHERE {where_clause}
+        RETURNING {returning};
+    """
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def list_query(
+        table: str,
+        returning: str,
+        filter_columns: tuple[str, ...],
+        pk_fields: tuple[str, ...],
+        with_after: bool,
+        with_limit: bool,
+) -> str:
+    """Build the SELECT statement filtered by equality of the columns and paginated by the primary key."""
+    conditions = [f"{column} = ${i}" for i, column in enumerate(filter_columns, 1)]
+    pk_clause = ', '.join(pk_fields)
+    index = len(filter_columns)
+    if with_after:
+        placeholders = ', '.join(f"${index + i}" for i in range(1, len(pk_fields) + 1))
+        conditions.append(f"({pk_clause}) > ({placeholders})")
+        index += len(pk_fields)
+    clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    clause += f" ORDER BY {pk_clause}"
+    if with_limit:
+        clause += f" LIMIT ${index + 1}"
+    return f"""
+        SELECT {returning}
+        FROM {table}
+        {clause};
+    """
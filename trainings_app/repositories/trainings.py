@@ -1,15 +1,44 @@
-from typing import Optional
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from asyncpg import Record
 from pydantic import ValidationError
 
 from trainings_app.db.fields.trainings import TrainingFields
 from trainings_app.db.fields.exercises import ExerciseFields
 from trainings_app.repositories.base import BaseRepository
+from trainings_app.repositories.queries import QUERY_CACHE_SIZE
 from trainings_app.schemas.trainings import GetTraining, CreateTrainingWithExerciseIDs, GetTrainingWithExerciseIDs
 from trainings_app.exceptions.exceptions import ConvertRecordError
 from trainings_app.custom_loggers.repositories import repo_logger
+from trainings_app.utils.records import model_from_record, models_from_records
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def train_with_exercises_query(columns: tuple[str, ...], returning: str) -> str:
+    """Build the statement inserting the training and its exercises passed as one array per trainings_exercises column."""
+    ex_index = len(columns) + 1
+    return f"""
+        WITH new_training AS (
+            INSERT INTO trainings ({', '.join(columns)})
+            VALUES ({', '.join(f'${i}' for i in range(1, ex_index))})
+            RETURNING {returning}
+        ), new_exercises AS (
+            INSERT INTO trainings_exercises
+                (training_id, exercise_id, order_in_training, sets, reps, rest_time_sec, extra_weight)
+            SELECT new_training.id, ex.exercise_id, ex.order_in_training, ex.sets, ex.reps, ex.rest_time_sec,
+                ex.extra_weight
+            FROM new_training, unnest(
+                ${ex_index}::integer[], ${ex_index + 1}::integer[], ${ex_index + 2}::integer[],
+                ${ex_index + 3}::integer[], ${ex_index + 4}::numeric[]
+            ) WITH ORDINALITY AS ex(exercise_id, sets, reps, rest_time_sec, extra_weight, order_in_training)
+        )
+        SELECT {returning}
+        FROM new_training;
+    """
 
 
 class TrainingRepository(BaseRepository):
+    table = 'trainings'
     fields = TrainingFields
     ex_fields = ExerciseFields
 
@@ -19,46 +48,47 @@ class TrainingRepository(BaseRepository):
         if not record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=record, error_detail="No record found to convert")
-        try:
-            return GetTraining(**record)
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=record, error_detail=f"{str(e)}")
+        return model_from_record(GetTraining, record)
 
     async def create(self, arg: dict) -> GetTraining:
-        keys, values, indexes = self.data_from_dict(arg)
-        query = f"""
-            INSERT INTO trainings ({', '.join(keys)})
-            VALUES ({', '.join([f'${i}' for i in indexes])})
-            RETURNING {self.fields.get_fields_str()};
-        """
+        query, values = self.make_insert_query(arg)
         record = await self.fetchrow_or_404(query, *values)
         return self.__get_training_from_record(record)
 
     async def get(self, train_id: int) -> GetTraining:
+        if (model := self.lookup(train_id)) is not None:
+            return model
         query = f"""
             SELECT {self.fields.get_fields_str()}
             FROM trainings
             WHERE id = $1;
         """
         record = await self.fetchrow_or_404(query, train_id)
-        return self.__get_training_from_record(record)
+        return self.remember(self.__get_training_from_record(record), train_id)
 
-    async def get_trainings(self, filters: Optional[dict] = None) -> list[GetTraining]:
-        values = []
-        query = f"""
-            SELECT {self.fields.get_fields_str()}
-            FROM trainings
-        """
-        if filters:
-            keys, values, indexes = self.data_from_dict(filters)
-            where_clause = ' AND '.join(f"{k} = ${i}" for k, i in zip(keys, indexes))
-            query += f"""
-                WHERE {where_clause}
-            """
-        query += ";"
+    async def get_with_version(self, train_id: int) -> tuple[GetTraining, str]:
+        record, version = await self.fetch_with_version_or_404(train_id)
+        return self.remember(self.__get_training_from_record(record), train_id), version
+
+    async def get_version(self, train_id: int) -> str:
+        return (await self.fetch_version_or_404(train_id))['version']
+
+    async def get_json_with_version(self, train_id: int) -> tuple[str, str]:
+        return await self.fetch_json_with_version_or_404(train_id)
+
+    async def get_trainings(
+            self,
+            filters: Optional[dict] = None,
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+    ) -> list[GetTraining]:
+        query, values = self.make_list_query(filters, limit=limit, after=after)
         records = await self.conn.fetch(query, *values)
-        return [GetTraining(**record) for record in records]
+        return models_from_records(GetTraining, records)
+
+    def iter_trainings(self, filters: Optional[dict] = None) -> AsyncIterator[Record]:
+        query, values = self.make_list_query(filters)
+        return self.iter_records(query, *values)
 
     async def delete(self, train_id: int) -> GetTraining:
         query = f"""
@@ -67,48 +97,48 @@ class TrainingRepository(BaseRepository):
             RETURNING {self.fields.get_fields_str()};
         """
         record = await self.fetchrow_or_404(query, train_id)
+        self.forget(train_id)
         return self.__get_training_from_record(record)
 
     async def update(self, train_id: int, update_data: dict) -> GetTraining:
-        keys, values, indexes = self.data_from_dict(update_data)
-        if not values:
+        if not update_data:
             repo_logger.error("Invalid update data")
             raise ValidationError("Invalid update data")
-        values.append(train_id)
-        set_clause = ', '.join([f"{k} = ${i}" for k, i in zip(keys, indexes)])
-        query = f"""
-            UPDATE trainings
-            SET {set_clause}
-            WHERE id = ${len(values)}
-            RETURNING {self.fields.get_fields_str()};            
-        """
+        query, values = self.make_update_query(update_data, train_id)
         record = await self.fetchrow_or_404(query, *values)
-        return self.__get_training_from_record(record)
+        return self.remember(self.__get_training_from_record(record), train_id)
 
     async def create_train_with_exercise_ids(self, tr_data: dict) -> GetTraining:
-        ex_data = tr_data.pop('exercises', None)
-        keys, values, indexes = self.data_from_dict(tr_data)
+        """
+        Create the training and its trainings_exercises rows with one statement.
+        The exercises are passed as fixed-shape arrays, so the query text does not depend on their count.
+        """
+
+        ex_data = tr_data.pop('exercises', None) or []
+        columns, values = self.columns_and_values(tr_data)
+        query = train_with_exercises_query(columns, self.fields.get_fields_str())
+        ex_arrays = [
+            [ex[key] for ex in ex_data]
+            for key in ('exercise_id', 'sets', 'reps', 'rest_time_sec', 'extra_weight')
+        ]
+        train_record = await self.fetchrow_or_404(query, *values, *ex_arrays)
+        return self.__get_training_from_record(train_record)
+
+    async def get_json_with_exercise_ids(self, training_id: int) -> str:
         query = f"""
-            INSERT INTO trainings ({', '.join(keys)})
-            VALUES ({', '.join([f'${i}' for i in indexes])})
-            RETURNING {self.fields.get_fields_str()};
+            SELECT json_build_object(
+                {self.fields.get_json_pairs_str()},
+                'exercises', ARRAY(
+                    SELECT exercise_id
+                    FROM trainings_exercises
+                    WHERE training_id = trainings.id
+                    ORDER BY order_in_training
+                )
+            )::text
+            FROM trainings
+            WHERE id = $1;
         """
-        async with self.conn.transaction():
-            train_record = await self.fetchrow_or_404(query, *values)
-            if ex_data:
-                values_clause = []
-                values_data = []
-                for ex_id in ex_data:
-                    values_clause.append(f"(${len(values_data) + 1}, ${len(values_data) + 2}, ${len(values_data) + 3})")
-                    values_data.extend([train_record['id'], ex_id, len(values_clause)])
-                values_clause_str = ',\n'.join(values_clause)
-                train_ex_query = f"""
-                    INSERT INTO Trainings_exercises (training_id, exercise_id, order_in_training)
-                    VALUES 
-                        {values_clause_str};
-                """
-                await self.conn.execute(train_ex_query, *values_data)
-            return self.__get_training_from_record(train_record)
+        return await self.fetch_json_or_404(query, training_id)
 
     async def get_training_with_exercise_ids(self, training_id: int) -> GetTrainingWithExerciseIDs:
         train_query = f"""
@@ -119,7 +149,8 @@ class TrainingRepository(BaseRepository):
         ex_query = f"""
             SELECT exercise_id
             FROM trainings_exercises
-            WHERE training_id = $1;
+            WHERE training_id = $1
+            ORDER BY order_in_training;
         """
         async with self.conn.transaction():
             train_record = await self.fetchrow_or_404(train_query, training_id)
@@ -127,9 +158,5 @@ class TrainingRepository(BaseRepository):
         if not train_record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=train_record, error_detail="No record found to convert")
-        try:
-            training_with_ex_ids = GetTrainingWithExerciseIDs(**train_record, exercises=ex_ids)
-            return training_with_ex_ids
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=train_record, error_detail=f"{str(e)}")
+        training_with_ex_ids = model_from_record(GetTrainingWithExerciseIDs, train_record, exercises=ex_ids)
+        return training_with_ex_ids
@@ -3,13 +3,16 @@ from pydantic import ValidationError
 
 from trainings_app.exceptions.exceptions import ConvertRecordError, CreateRecordError
 from trainings_app.custom_loggers.repositories import repo_logger
+from trainings_app.utils.records import model_from_record, models_from_records
 from trainings_app.repositories.base import BaseRepository
 from trainings_app.schemas.trainings_exercises import CreateTrainingExercise, GetTrainingExercise
 from trainings_app.db.fields.trainings_exercises import TrainingExerciseFields
 
 
 class TrainingExerciseRepository(BaseRepository):
+    table = 'trainings_exercises'
     fields = TrainingExerciseFields
+    pk_fields = ('training_id', 'exercise_id')
 
     @staticmethod
     def __get_model_from_record(record: dict) -> GetTrainingExercise:
@@ -17,46 +20,35 @@ class TrainingExerciseRepository(BaseRepository):
         if not record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=record, error_detail="No record found to convert")
-        try:
-            return GetTrainingExercise(**record)
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=record, error_detail=f"{str(e)}")
+        return model_from_record(GetTrainingExercise, record)
 
     async def create(self, arg: dict) -> GetTrainingExercise:
-        keys, values, indexes = self.data_from_dict(arg)
-        query = f"""
-            INSERT INTO trainings_exercises ({', '.join(keys)})
-            VALUES ({', '.join([f'${i}' for i in indexes])})
-            RETURNING {self.fields.get_fields_str()};
-        """
+        query, values = self.make_insert_query(arg)
         record = await self.fetchrow_or_404(query, *values)
         return self.__get_model_from_record(record)
 
+    async def create_many(self, args: list[dict]) -> list[Optional[GetTrainingExercise]]:
+        records = await self.insert_many(args, unique_fields=self.pk_fields)
+        return [self.__get_model_from_record(record) if record else None for record in records]
+
     async def get(self, train_id: int, exercise_id: int) -> GetTrainingExercise:
+        if (model := self.lookup(train_id, exercise_id)) is not None:
+            return model
         query = f"""
             SELECT {self.fields.get_fields_str()}
             FROM trainings_exercises
             WHERE training_id = $1 AND exercise_id = $2;
         """
         record = await self.fetchrow_or_404(query, train_id, exercise_id)
-        return self.__get_model_from_record(record)
+        return self.remember(self.__get_model_from_record(record), train_id, exercise_id)
 
     async def update(self, train_id: int, exercise_id: int, update_data: dict) -> GetTrainingExercise:
-        keys, values, indexes = self.data_from_dict(update_data)
-        if not values:
+        if not update_data:
             repo_logger.error("Invalid update data")
             raise ValidationError("Invalid update data")
-        values += [train_id, exercise_id]
-        set_clause = ', '.join([f"{k} = ${i}" for k, i in zip(keys, indexes)])
-        query = f"""
-            UPDATE trainings_exercises
-            SET {set_clause}
-            WHERE training_id = ${len(values) - 1} AND exercise_id = ${len(values)}
-            RETURNING {self.fields.get_fields_str()};            
-        """
+        query, values = self.make_update_query(update_data, train_id, exercise_id)
         record = await self.fetchrow_or_404(query, *values)
-        return self.__get_model_from_record(record)
+        return self.remember(self.__get_model_from_record(record), train_id, exercise_id)
 
     async def delete(self, train_id: int, exercise_id: int):
         query = f"""
@@ -65,20 +57,15 @@ class TrainingExerciseRepository(BaseRepository):
             RETURNING {self.fields.get_fields_str()};
         """
         record = await self.fetchrow_or_404(query, train_id, exercise_id)
+        self.forget(train_id, exercise_id)
         return self.__get_model_from_record(record)
 
-    async def get_trainings_exercises(self, filters: Optional[dict] = None) -> list[GetTrainingExercise]:
-        values = []
-        query = f"""
-                    SELECT {self.fields.get_fields_str()}
-                    FROM trainings_exercises
-                """
-        if filters:
-            keys, values, indexes = self.data_from_dict(filters)
-            where_clause = ' AND '.join(f"{k} = ${i}" for k, i in zip(keys, indexes))
-            query += f"""
-                        WHERE {where_clause}
-                    """
-        query += ";"
+    async def get_trainings_exercises(
+            self,
+            filters: Optional[dict] = None,
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+    ) -> list[GetTrainingExercise]:
+        query, values = self.make_list_query(filters, limit=limit, after=after)
         records = await self.conn.fetch(query, *values)
-        return [GetTrainingExercise(**record) for record in records]
+        return models_from_records(GetTrainingExercise, records)
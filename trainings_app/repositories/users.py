@@ -1,18 +1,22 @@
 import json
-from typing import Optional
+from typing import AsyncIterator, Optional
 from datetime import datetime
+from asyncpg import Record
 from pydantic import ValidationError
 
 from trainings_app.custom_loggers.console_debug import console_logger
 from trainings_app.db.fields.users import UserFields
+from trainings_app.db_redis.user_cache import invalidate_user
 from trainings_app.schemas.users import GetUser
 from trainings_app.repositories.base import BaseRepository
 from trainings_app.exceptions.exceptions import ConvertRecordError
 from trainings_app.custom_loggers.repositories import repo_logger
+from trainings_app.utils.records import model_from_record, models_from_records
 from trainings_app.utils.password_hashing import hash_password
 
 
 class UserRepository(BaseRepository):
+    table = 'users'
     fields = UserFields
 
     @staticmethod
@@ -22,31 +26,32 @@ class UserRepository(BaseRepository):
         if not record:
             repo_logger.error(f"No record found to convert Error")
             raise ConvertRecordError(record=record, error_detail="No record found to convert")
-        try:
-            return GetUser(**record)
-        except ValidationError as e:
-            repo_logger.error(f"Convert to model Error: {str(e)}")
-            raise ConvertRecordError(record=record, error_detail=f"{str(e)}")
+        return model_from_record(GetUser, record)
 
     async def create(self, user: dict) -> GetUser:
-        user['password_hash'] = hash_password(user['password_hash'])
-        keys, values, indexes = self.data_from_dict(user)
-        query = f"""
-            INSERT INTO users ({', '.join(keys)})
-            VALUES ({', '.join([f'${i}' for i in indexes])})
-            RETURNING {self.fields.get_fields_str()};
-        """
+        user['password_hash'] = await hash_password(user['password_hash'])
+        query, values = self.make_insert_query(user)
         user_record = await self.fetchrow_or_404(query, *values)
         return self.__get_user_from_record(user_record)
 
+    async def create_many(self, users: list[dict]) -> list[Optional[GetUser]]:
+        """
+        Unlike create, expects the passwords already hashed: hashing a batch takes seconds,
+        so it's done with hash_passwords before the connection is acquired.
+        """
+        user_records = await self.insert_many(users, unique_fields=('username',))
+        return [self.__get_user_from_record(record) if record else None for record in user_records]
+
     async def get(self, user_id: int) -> GetUser:
+        if (model := self.lookup(user_id)) is not None:
+            return model
         query = f"""
             SELECT {self.fields.get_fields_str()}
             FROM users
             WHERE id = $1;
         """
         user_record = await self.fetchrow_or_404(query, user_id)
-        return self.__get_user_from_record(user_record)
+        return self.remember(self.__get_user_from_record(user_record), user_id)
 
     async def delete(self, user_id: int) -> GetUser:
         query = f"""
@@ -56,23 +61,22 @@ class UserRepository(BaseRepository):
             RETURNING {self.fields.get_fields_str()};
         """
         user_record = await self.fetchrow_or_404(query, datetime.now(), user_id)
-        return self.__get_user_from_record(user_record)
+        await invalidate_user(user_id)
+        return self.remember(self.__get_user_from_record(user_record), user_id)
 
-    async def get_users(self, filters: Optional[dict]) -> list[GetUser]:
-        values = []
-        query = f"""
-            SELECT {self.fields.get_fields_str()}
-            FROM users
-        """
-        if filters:
-            keys, values, indexes = self.data_from_dict(filters)
-            where_clause = ' AND '.join([f"{key} = ${ind}" for key, ind in zip(keys, indexes)])
-            query += f"""
-                WHERE {where_clause}
-            """
-        query += ";"
+    async def get_users(
+            self,
+            filters: Optional[dict],
+            limit: Optional[int] = None,
+            after: Optional[tuple] = None,
+    ) -> list[GetUser]:
+        query, values = self.make_list_query(filters, limit=limit, after=after)
         user_records = await self.conn.fetch(query, *values)
-        return [GetUser(**record) for record in user_records]
+        return models_from_records(GetUser, user_records)
+
+    def iter_users(self, filters: Optional[dict] = None) -> AsyncIterator[Record]:
+        query, values = self.make_list_query(filters)
+        return self.iter_records(query, *values)
 
     async def get_new_users_for_report(self, filters: dict) -> str:
         query = f"""
@@ -84,23 +88,16 @@ class UserRepository(BaseRepository):
             user_records = await self.conn.fetch(query, *filters.values())
         except Exception as e:
             console_logger.info(f"{e}")
-        user_records_list = [GetUser(**record) for record in user_records]
+        user_records_list = models_from_records(GetUser, user_records)
         return user_records_list
 
     async def update(self, user_id: int, update_data: dict) -> GetUser:
         if update_data.get('password_hash'):
-            update_data['password_hash'] = hash_password(update_data['password_hash'])
-        keys, values, indexes = self.data_from_dict(update_data)
-        if not values:
+            update_data['password_hash'] = await hash_password(update_data['password_hash'])
+        if not update_data:
             repo_logger.error(f"Invalid update data")
             raise ValidationError("Invalid update data")
-        values.append(user_id)
-        set_clause = ", ".join([f"{key} = ${idx}" for key, idx in zip(keys, indexes)])
-        query = f"""
-            UPDATE users
-            SET {set_clause}
-            WHERE id = ${len(indexes) + 1} AND deleted_at IS NULL
-            RETURNING {self.fields.get_fields_str()}; 
-        """
+        query, values = self.make_update_query(update_data, user_id, condition='deleted_at IS NULL')
         user_record = await self.fetchrow_or_404(query, *values)
-        return self.__get_user_from_record(user_record)
+        await invalidate_user(user_id)
+        return self.remember(self.__get_user_from_record(user_record), user_id)
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, Path, status, HTTPException
+from asyncpg import Pool
+from fastapi import APIRouter, Body, Depends, Path, Query, Request, Response, status, HTTPException
 from typing import Annotated
 
 from trainings_app.auth.utils.jwt_utils import get_current_auth_user_with_role
-from trainings_app.db.connection import get_repo
+from trainings_app.db.connection import get_repo, get_api_pool
 from trainings_app.schemas.clients import (
     GetClient, CreateClient, PutClient, PatchClient, ClientFilters
 )
 from trainings_app.repositories.clients import ClientRepository
+from trainings_app.schemas.bulk import BulkCreateResult, BULK_MAX_ROWS
+from trainings_app.schemas.pagination import Page, PaginationParams
+from trainings_app.schemas.streaming import StreamFormatEnum
 from trainings_app.schemas.users import stuffer_roles, client_roles, GetUser, RoleEnum
+from trainings_app.utils.bulk import make_bulk_result
+from trainings_app.utils.etag import etag_matches, make_etag, not_modified_response, with_etag
+from trainings_app.utils.pagination import decode_cursor, make_page
+from trainings_app.utils.pg_json import pg_json_enabled, pg_json_page_response
+from trainings_app.utils.responses import ModelJSONResponse
+from trainings_app.utils.streaming import stream_records
 
 router = APIRouter(
     prefix='/clients',
@@ -15,6 +25,14 @@ router = APIRouter(
 )
 
 
+def check_client_access(client_user_id: int, user: GetUser) -> None:
+    if client_user_id != user.id and user.role == RoleEnum.USER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='No access to the specified user',
+        )
+
+
 @router.post(
     path='/',
     response_model=GetClient,
@@ -26,14 +44,41 @@ async def create_client(
         client_repo: ClientRepository = Depends(get_repo(ClientRepository)),
         user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles + client_roles)),
 ):
-    if client.user_id != user.id and user.role == RoleEnum.USER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail='No access to the specified user',
-        )
+    check_client_access(client.user_id, user)
     return await client_repo.create(client.model_dump(exclude_unset=True, exclude_defaults=True))
 
 
+@router.post(
+    path='/bulk',
+    response_model=BulkCreateResult[GetClient],
+    description='Create the batch of clients, rows duplicating existing clients are skipped',
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_clients(
+        clients: Annotated[list[CreateClient], Body(min_length=1, max_length=BULK_MAX_ROWS)],
+        client_repo: ClientRepository = Depends(get_repo(ClientRepository)),
+        user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
+):
+    records = await client_repo.create_many([client.model_dump() for client in clients])
+    return ModelJSONResponse(make_bulk_result(records), status_code=status.HTTP_201_CREATED)
+
+
+@router.get(
+    path='/export',
+    response_model=list[GetClient],
+    description='Stream all clients as NDJSON or a JSON array',
+    status_code=status.HTTP_200_OK,
+)
+async def export_clients(
+        filter_model: ClientFilters = Depends(),
+        stream_format: Annotated[StreamFormatEnum, Query(alias='format')] = StreamFormatEnum.NDJSON,
+        pool: Pool = Depends(get_api_pool),
+        user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
+):
+    filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
+    return stream_records(pool, lambda conn: ClientRepository(conn).iter_clients(filter_dict), stream_format)
+
+
 @router.get(
     path='/{client_id}',
     response_model=GetClient,
@@ -41,32 +86,43 @@ async def create_client(
     status_code=status.HTTP_200_OK,
 )
 async def get_client(
+        request: Request,
+        response: Response,
         client_id: Annotated[int, Path(gt=0)],
         client_repo: ClientRepository = Depends(get_repo(ClientRepository)),
         user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles + client_roles)),
 ):
-    client = await client_repo.get(client_id)
-    if client.user_id != user.id and user.role == RoleEnum.USER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail='No access to the specified user',
-        )
-    return await client_repo.get(client_id)
+    if request.headers.get('if-none-match'):
+        # Check the version first, the full row is loaded only if it changed
+        version = await client_repo.get_version(client_id)
+        check_client_access(version['user_id'], user)
+        etag = make_etag('clients', client_id, version['version'])
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+    client, version = await client_repo.get_with_version(client_id)
+    check_client_access(client.user_id, user)
+    return with_etag(client, response, make_etag('clients', client_id, version))
 
 
 @router.get(
     path='/',
-    response_model=list[GetClient],
+    response_model=Page[GetClient],
     description='Retrieve list of clients',
     status_code=status.HTTP_200_OK,
 )
 async def get_clients(
         filter_model: ClientFilters = Depends(),
+        page: PaginationParams = Depends(),
         client_repo: ClientRepository = Depends(get_repo(ClientRepository)),
         user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
 ):
     filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
-    return await client_repo.get_clients(filter_dict)
+    after = decode_cursor(page.after, len(ClientRepository.pk_fields))
+    if pg_json_enabled('clients.list'):
+        records = await client_repo.get_json_list(filter_dict, limit=page.limit + 1, after=after)
+        return pg_json_page_response(records, page.limit, ClientRepository.pk_fields)
+    clients = await client_repo.get_clients(filter_dict, limit=page.limit + 1, after=after)
+    return ModelJSONResponse(make_page(clients, page.limit, ClientRepository.pk_fields))
 
 
 @router.delete(
@@ -80,7 +136,7 @@ async def delete_client(
         client_repo: ClientRepository = Depends(get_repo(ClientRepository)),
         user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles + client_roles)),
 ):
-    return await client_repo.delete(client_id)
+    return await client_repo.delete(client_id, user=user)
 
 
 @router.put(
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Path, Depends, status
+from asyncpg import Pool
+from fastapi import APIRouter, Body, Path, Depends, Query, Request, Response, status
 from typing import Annotated
 
 from trainings_app.auth.utils.jwt_utils import get_current_auth_user_with_role
-from trainings_app.db.connection import get_repo
+from trainings_app.db.connection import get_repo, get_api_pool, get_pool_repo
 from trainings_app.schemas.exercises import GetExercise, CreateExercise, PutExercise, PatchExercise, FilterExercise
 from trainings_app.repositories.exercises import ExerciseRepository
+from trainings_app.schemas.bulk import BulkCreateResult, BULK_MAX_ROWS
+from trainings_app.schemas.pagination import Page, PaginationParams
+from trainings_app.schemas.streaming import StreamFormatEnum
 from trainings_app.schemas.users import stuffer_roles, client_roles
+from trainings_app.utils.bulk import make_bulk_result
+from trainings_app.utils.etag import etag_matches, make_etag, not_modified_response, with_etag
+from trainings_app.utils.pagination import decode_cursor, make_page
+from trainings_app.utils.pg_json import pg_json_enabled, pg_json_page_response
+from trainings_app.utils.responses import ModelJSONResponse
+from trainings_app.utils.streaming import stream_records
 
 router = APIRouter(
     prefix='/exercises',
@@ -16,16 +26,48 @@ router = APIRouter(
 
 @router.get(
     path='/',
-    response_model=list[GetExercise],
+    response_model=Page[GetExercise],
     description='Retrieve list of exercises',
     status_code=status.HTTP_200_OK,
 )
 async def get_exercises_list(
+        request: Request,
+        response: Response,
         filter_model: FilterExercise = Depends(),
-        exercise_repo: ExerciseRepository = Depends(get_repo(ExerciseRepository)),
+        page: PaginationParams = Depends(),
+        exercise_repo: ExerciseRepository = Depends(get_pool_repo(ExerciseRepository)),
+):
+    filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
+    after = decode_cursor(page.after, len(ExerciseRepository.pk_fields))
+    pg_json = pg_json_enabled('exercises.list')
+    etag = None
+    catalog_version = await exercise_repo.get_catalog_version()
+    if catalog_version is not None:
+        etag = make_etag('exercises', catalog_version, request.url.query, pg_json)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+    if pg_json:
+        records = await exercise_repo.get_json_list(filter_dict, limit=page.limit + 1, after=after)
+        result = pg_json_page_response(records, page.limit, ExerciseRepository.pk_fields)
+    else:
+        exercises = await exercise_repo.get_exercises(filter_dict, limit=page.limit + 1, after=after)
+        result = ModelJSONResponse(make_page(exercises, page.limit, ExerciseRepository.pk_fields))
+    return with_etag(result, response, etag) if etag else result
+
+
+@router.get(
+    path='/export',
+    response_model=list[GetExercise],
+    description='Stream all exercises as NDJSON or a JSON array',
+    status_code=status.HTTP_200_OK,
+)
+async def export_exercises(
+        filter_model: FilterExercise = Depends(),
+        stream_format: Annotated[StreamFormatEnum, Query(alias='format')] = StreamFormatEnum.NDJSON,
+        pool: Pool = Depends(get_api_pool),
 ):
     filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
-    return await exercise_repo.get_exercises(filter_dict)
+    return stream_records(pool, lambda conn: ExerciseRepository(conn).iter_exercises(filter_dict), stream_format)
 
 
 @router.get(
@@ -54,6 +96,20 @@ async def create_exercise(
     return await exercise_repo.create(model.dict())
 
 
+@router.post(
+    path='/bulk',
+    response_model=BulkCreateResult[GetExercise],
+    description='Create the batch of exercises, rows with an existing title are skipped',
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_exercises(
+        models: Annotated[list[CreateExercise], Body(min_length=1, max_length=BULK_MAX_ROWS)],
+        exercise_repo: ExerciseRepository = Depends(get_repo(ExerciseRepository)),
+):
+    records = await exercise_repo.create_many([model.model_dump() for model in models])
+    return ModelJSONResponse(make_bulk_result(records), status_code=status.HTTP_201_CREATED)
+
+
 @router.put(
     path='/{exercise_id}',
     response_model=GetExercise,
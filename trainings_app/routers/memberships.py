@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, Path, Query, status
 from trainings_app.schemas.memberships import GetMembership, CreateMembership, PutMembership, PatchMembership
 from trainings_app.schemas.users import stuffer_roles
 from trainings_app.repositories.memberships import MembershipRepository
-from trainings_app.db.connection import get_repo
+from trainings_app.db.connection import get_repo, get_pool_repo
 from trainings_app.auth.utils.jwt_utils import get_current_auth_user_with_role
 
 router = APIRouter(
@@ -22,7 +22,7 @@ router = APIRouter(
 )
 async def get_memberships(
         access_level: Annotated[Optional[str], Query(description="Filter by access level")] = None,
-        repo: MembershipRepository = Depends(get_repo(MembershipRepository)),
+        repo: MembershipRepository = Depends(get_pool_repo(MembershipRepository)),
 ):
     return await repo.get_memberships(access_level)
 
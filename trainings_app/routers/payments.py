@@ -1,26 +1,56 @@
-from fastapi import APIRouter, Depends, status
+import hashlib
+from typing import Annotated, Optional
+
+from asyncpg import Pool
+from fastapi import APIRouter, Depends, Header, status
 
 from trainings_app.auth.utils.jwt_utils import get_current_auth_user_with_role
 from trainings_app.schemas.payments import (
     CreatePayment,
     GetExtendedPaymentModel,
 )
-from trainings_app.repositories.payments import PaymentRepository
-from trainings_app.db.connection import get_repo
+from trainings_app.db.connection import get_api_pool
+from trainings_app.db_redis.idempotency import IdempotencyStore
+from trainings_app.exceptions.exceptions import PaymentServiceError, RecordNotFoundError
+from trainings_app.payment_service.client import PaymentServiceClient, get_payment_service_client
+from trainings_app.repositories.memberships import MembershipRepository
 from trainings_app.schemas.users import GetUser, stuffer_roles, client_roles
 
 router = APIRouter(prefix='/payments', tags=['payments'])
 
 
+def payment_not_sent(error: Exception) -> bool:
+    """The failures raised before the request reached the payment service, retrying them can't pay twice."""
+    if isinstance(error, PaymentServiceError):
+        return not error.request_sent
+    return isinstance(error, RecordNotFoundError)
+
+
+payments_idempotency: IdempotencyStore[GetExtendedPaymentModel] = IdempotencyStore(
+    'payments', GetExtendedPaymentModel, retryable=payment_not_sent
+)
+
+
 @router.post(
     path='/',
     response_model=GetExtendedPaymentModel,
-    description="Create the payment",
+    description="Create the payment. The repeated requests with the same Idempotency-Key get the first response.",
     status_code=status.HTTP_201_CREATED,
 )
 async def create_payment(
         payment: CreatePayment,
-        repo: PaymentRepository = Depends(get_repo(PaymentRepository)),
+        idempotency_key: Annotated[Optional[str], Header(min_length=1, max_length=255)] = None,
+        pool: Pool = Depends(get_api_pool),
+        payment_client: PaymentServiceClient = Depends(get_payment_service_client),
         user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles + client_roles)),
 ):
-    return await repo.create(payment.dict())
+    async def create() -> GetExtendedPaymentModel:
+        # The connection goes back to the pool before the call, so a slow payment service can't hold it
+        async with pool.acquire() as conn:
+            membership = await MembershipRepository(conn).get(payment.membership_id)
+        return await payment_client.create_payment(payment.client_id, membership)
+
+    if idempotency_key is None:
+        return await create()
+    fingerprint = hashlib.sha256(payment.model_dump_json().encode()).hexdigest()
+    return await payments_idempotency.run(f"{user.id}:{idempotency_key}", fingerprint, create)
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Path, Depends, status
+from asyncpg import Pool
+from fastapi import APIRouter, Path, Depends, Query, Request, Response, status
 from typing import Annotated
 
-from trainings_app.auth.utils.jwt_utils import get_current_token_payload
-from trainings_app.db.connection import get_repo
+from trainings_app.auth.utils.jwt_utils import get_current_token_payload, get_current_auth_user_with_role
+from trainings_app.db.connection import get_repo, get_api_pool
 from trainings_app.schemas.trainings import CreateTraining, GetTraining, FilterTraining, PutTraining, PatchTraining, \
     CreateTrainingWithExerciseIDs, GetTrainingWithExerciseIDs
 from trainings_app.repositories.trainings import TrainingRepository
+from trainings_app.schemas.pagination import Page, PaginationParams
+from trainings_app.schemas.streaming import StreamFormatEnum
+from trainings_app.schemas.users import GetUser, stuffer_roles
+from trainings_app.utils.etag import etag_matches, make_etag, not_modified_response, with_etag
+from trainings_app.utils.pagination import decode_cursor, make_page
+from trainings_app.utils.pg_json import pg_json_enabled, pg_json_page_response, pg_json_response
+from trainings_app.utils.responses import ModelJSONResponse
+from trainings_app.utils.streaming import stream_records
 
 router = APIRouter(
     prefix='/trainings',
@@ -16,16 +25,38 @@ router = APIRouter(
 
 @router.get(
     path='/',
-    response_model=list[GetTraining],
+    response_model=Page[GetTraining],
     description='Retrieve list of trainings',
     status_code=status.HTTP_200_OK,
 )
 async def get_trainings_list(
         filter_model: FilterTraining = Depends(),
+        page: PaginationParams = Depends(),
         train_repo: TrainingRepository = Depends(get_repo(TrainingRepository)),
 ):
     filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
-    return await train_repo.get_trainings(filter_dict)
+    after = decode_cursor(page.after, len(TrainingRepository.pk_fields))
+    if pg_json_enabled('trainings.list'):
+        records = await train_repo.get_json_list(filter_dict, limit=page.limit + 1, after=after)
+        return pg_json_page_response(records, page.limit, TrainingRepository.pk_fields)
+    trainings = await train_repo.get_trainings(filter_dict, limit=page.limit + 1, after=after)
+    return ModelJSONResponse(make_page(trainings, page.limit, TrainingRepository.pk_fields))
+
+
+@router.get(
+    path='/export',
+    response_model=list[GetTraining],
+    description='Stream all trainings as NDJSON or a JSON array',
+    status_code=status.HTTP_200_OK,
+)
+async def export_trainings(
+        filter_model: FilterTraining = Depends(),
+        stream_format: Annotated[StreamFormatEnum, Query(alias='format')] = StreamFormatEnum.NDJSON,
+        pool: Pool = Depends(get_api_pool),
+        user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
+):
+    filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
+    return stream_records(pool, lambda conn: TrainingRepository(conn).iter_trainings(filter_dict), stream_format)
 
 
 @router.get(
@@ -35,10 +66,23 @@ async def get_trainings_list(
     status_code=status.HTTP_200_OK,
 )
 async def get_training(
+        request: Request,
+        response: Response,
         train_id: Annotated[int, Path(gt=0)],
         train_repo: TrainingRepository = Depends(get_repo(TrainingRepository)),
 ):
-    return await train_repo.get(train_id)
+    pg_json = pg_json_enabled('trainings.get')
+    if request.headers.get('if-none-match'):
+        # Check the version first, the full row is loaded only if it changed
+        etag = make_etag('trainings', train_id, await train_repo.get_version(train_id), pg_json)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+    # The ETag is made of the version read with the body, so both describe the same row version
+    if pg_json:
+        json_text, version = await train_repo.get_json_with_version(train_id)
+        return with_etag(pg_json_response(json_text), response, make_etag('trainings', train_id, version, pg_json))
+    training, version = await train_repo.get_with_version(train_id)
+    return with_etag(training, response, make_etag('trainings', train_id, version, pg_json))
 
 
 @router.get(
@@ -51,6 +95,8 @@ async def get_training_with_exercise_ids(
         train_id: Annotated[int, Path(gt=0)],
         train_repo: TrainingRepository = Depends(get_repo(TrainingRepository)),
 ):
+    if pg_json_enabled('trainings.get_with_exercise_ids'):
+        return pg_json_response(await train_repo.get_json_with_exercise_ids(train_id))
     return await train_repo.get_training_with_exercise_ids(train_id)
 
 
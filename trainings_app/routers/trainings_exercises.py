@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Path, Depends, status
+from fastapi import APIRouter, Body, Path, Depends, status
 from typing import Annotated
 
 from trainings_app.db.connection import get_repo
 from trainings_app.schemas.trainings_exercises import CreateTrainingExercise, GetTrainingExercise, \
     FilterTrainingExercise, PatchTrainingExercise, PutTrainingExercise
 from trainings_app.repositories.trainings_exercises import TrainingExerciseRepository
+from trainings_app.schemas.bulk import BulkCreateResult, BULK_MAX_ROWS
+from trainings_app.schemas.pagination import Page, PaginationParams
+from trainings_app.utils.bulk import make_bulk_result
+from trainings_app.utils.pagination import decode_cursor, make_page
+from trainings_app.utils.pg_json import pg_json_enabled, pg_json_page_response
+from trainings_app.utils.responses import ModelJSONResponse
 
 router = APIRouter(prefix='/trainings-exercises', tags=['trainings-exercises'])
 
@@ -22,6 +28,20 @@ async def create_training_exercise(
     return await repo.create(create_model.dict())
 
 
+@router.post(
+    path='/bulk',
+    response_model=BulkCreateResult[GetTrainingExercise],
+    description='Add the batch of training-exercise records, already existing pairs are skipped',
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_trainings_exercises(
+        create_models: Annotated[list[CreateTrainingExercise], Body(min_length=1, max_length=BULK_MAX_ROWS)],
+        repo: TrainingExerciseRepository = Depends(get_repo(TrainingExerciseRepository)),
+):
+    records = await repo.create_many([create_model.model_dump() for create_model in create_models])
+    return ModelJSONResponse(make_bulk_result(records), status_code=status.HTTP_201_CREATED)
+
+
 @router.get(
     path='/{training_id}/{exercise_id}',
     response_model=GetTrainingExercise,
@@ -38,16 +58,22 @@ async def get_training_exercise(
 
 @router.get(
     path='/',
-    response_model=list[GetTrainingExercise],
+    response_model=Page[GetTrainingExercise],
     description="Retrieve training-exercise records",
     status_code=status.HTTP_200_OK,
 )
 async def get_trainings_exercises(
         filter_model: FilterTrainingExercise = Depends(),
+        page: PaginationParams = Depends(),
         repo: TrainingExerciseRepository = Depends(get_repo(TrainingExerciseRepository)),
 ):
     filter_dict = filter_model.model_dump(exclude_defaults=True) if filter_model else None
-    return await repo.get_trainings_exercises(filter_dict)
+    after = decode_cursor(page.after, len(TrainingExerciseRepository.pk_fields))
+    if pg_json_enabled('trainings_exercises.list'):
+        records = await repo.get_json_list(filter_dict, limit=page.limit + 1, after=after)
+        return pg_json_page_response(records, page.limit, TrainingExerciseRepository.pk_fields)
+    records = await repo.get_trainings_exercises(filter_dict, limit=page.limit + 1, after=after)
+    return ModelJSONResponse(make_page(records, page.limit, TrainingExerciseRepository.pk_fields))
 
 
 @router.delete(
@@ -1,28 +1,60 @@
 from typing import Annotated, Optional
-from fastapi import APIRouter, Depends, Path, status, HTTPException
+from asyncpg import Pool
+from fastapi import APIRouter, Body, Depends, Path, Query, status, HTTPException
 
 from trainings_app.auth.utils.jwt_utils import get_current_auth_user_with_role
 from trainings_app.schemas.users import GetUser, CreateUser, PutUser, PatchUser, FilterUser, stuffer_roles, \
     client_roles, RoleEnum, DateFilterUser
-from trainings_app.db.connection import get_repo
+from trainings_app.db.connection import get_repo, get_api_pool
 from trainings_app.repositories.users import UserRepository
+from trainings_app.schemas.bulk import BulkCreateResult, USERS_BULK_MAX_ROWS
+from trainings_app.schemas.pagination import Page, PaginationParams
+from trainings_app.schemas.streaming import StreamFormatEnum
+from trainings_app.utils.bulk import make_bulk_result
+from trainings_app.utils.pagination import decode_cursor, make_page
+from trainings_app.utils.password_hashing import hash_passwords
+from trainings_app.utils.pg_json import pg_json_enabled, pg_json_page_response
+from trainings_app.utils.responses import ModelJSONResponse
+from trainings_app.utils.streaming import stream_records
 
 router = APIRouter(prefix='/users', tags=['user'])
 
 
 @router.get(
     path='/',
-    response_model=list[GetUser],
+    response_model=Page[GetUser],
     description="Retrieve list of users",
     status_code=status.HTTP_200_OK,
 )
 async def get_users(
         filter_model: FilterUser = Depends(),
+        page: PaginationParams = Depends(),
         user_repo: UserRepository = Depends(get_repo(UserRepository)),
         user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
 ):
     filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
-    return await user_repo.get_users(filter_dict)
+    after = decode_cursor(page.after, len(UserRepository.pk_fields))
+    if pg_json_enabled('users.list'):
+        records = await user_repo.get_json_list(filter_dict, limit=page.limit + 1, after=after)
+        return pg_json_page_response(records, page.limit, UserRepository.pk_fields)
+    users = await user_repo.get_users(filter_dict, limit=page.limit + 1, after=after)
+    return ModelJSONResponse(make_page(users, page.limit, UserRepository.pk_fields))
+
+
+@router.get(
+    path='/export',
+    response_model=list[GetUser],
+    description="Stream all users as NDJSON or a JSON array",
+    status_code=status.HTTP_200_OK,
+)
+async def export_users(
+        filter_model: FilterUser = Depends(),
+        stream_format: Annotated[StreamFormatEnum, Query(alias='format')] = StreamFormatEnum.NDJSON,
+        pool: Pool = Depends(get_api_pool),
+        user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
+):
+    filter_dict = filter_model.model_dump(exclude_defaults=True, exclude_unset=True) if filter_model else None
+    return stream_records(pool, lambda conn: UserRepository(conn).iter_users(filter_dict), stream_format)
 
 
 @router.get(
@@ -71,6 +103,27 @@ async def create_user(
     return await user_repo.create(user.dict())
 
 
+@router.post(
+    path='/bulk',
+    response_model=BulkCreateResult[GetUser],
+    description="Create the batch of users, rows with an existing username or email are skipped",
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_users(
+        users: Annotated[list[CreateUser], Body(min_length=1, max_length=USERS_BULK_MAX_ROWS)],
+        pool: Pool = Depends(get_api_pool),
+        user: GetUser = Depends(get_current_auth_user_with_role(allowed_roles=stuffer_roles)),
+):
+    users_data = [user_model.model_dump() for user_model in users]
+    # Hash before acquiring the connection, so it isn't held while the threads work
+    password_hashes = await hash_passwords([user_data['password_hash'] for user_data in users_data])
+    for user_data, password_hash in zip(users_data, password_hashes):
+        user_data['password_hash'] = password_hash
+    async with pool.acquire() as conn:
+        records = await UserRepository(conn).create_many(users_data)
+    return ModelJSONResponse(make_bulk_result(records), status_code=status.HTTP_201_CREATED)
+
+
 @router.delete(
     path='/{user_id}',
     response_model=GetUser,
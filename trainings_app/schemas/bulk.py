@@ -0,0 +1,47 @@
+from enum import Enum
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar('T')
+
+BULK_MAX_ROWS = 50_000
+# Every user row is hashed with bcrypt, about MAX_WORKERS / 0.25 s rows per second with the cost 12
+USERS_BULK_MAX_ROWS = 500
+
+
+class BulkRowStatusEnum(str, Enum):
+    CREATED = 'CREATED'
+    SKIPPED = 'SKIPPED'
+
+
+class BulkRowResult(BaseModel, Generic[T]):
+    index: int = Field(
+        ge=0,
+        description='Index of the row in the request body',
+        example=0,
+    )
+    status: BulkRowStatusEnum = Field(
+        description='CREATED or SKIPPED if the row duplicates an existing record or a previous row',
+        example='CREATED',
+    )
+    record: Optional[T] = Field(
+        default=None,
+        description='The created record',
+    )
+
+
+class BulkCreateResult(BaseModel, Generic[T]):
+    created: int = Field(
+        ge=0,
+        description='Number of created records',
+        example=100,
+    )
+    skipped: int = Field(
+        ge=0,
+        description='Number of skipped rows',
+        example=0,
+    )
+    results: list[BulkRowResult[T]] = Field(
+        description='Result for each row in the order of the request body',
+    )
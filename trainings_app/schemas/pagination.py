@@ -0,0 +1,31 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar('T')
+
+
+class PaginationParams(BaseModel):
+    limit: int = Field(
+        default=50,
+        ge=1,
+        le=500,
+        description='Maximum number of records on the page',
+        example=50,
+    )
+    after: Optional[str] = Field(
+        default=None,
+        description='Cursor of the last record of the previous page (next_cursor of the previous response)',
+        example='WzEwMF0=',
+    )
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T] = Field(
+        description='Records of the page ordered by the primary key',
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description='Cursor for the next page. Null if this is the last page',
+        example='WzEwMF0=',
+    )
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class StreamFormatEnum(str, Enum):
+    NDJSON = 'ndjson'
+    JSON = 'json'
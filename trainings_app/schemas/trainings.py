@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import date
 from enum import Enum
 
@@ -68,6 +68,33 @@ class CreateTraining(BaseModel):
     )
 
 
+class TrainingExerciseItem(BaseModel):
+    exercise_id: int = Field(
+        description='ID of the exercise',
+        example=1,
+    )
+    sets: int = Field(
+        default=3,
+        description='Number of sets for the exercise',
+        example=3,
+    )
+    reps: int = Field(
+        default=10,
+        description='Number of repetitions per set',
+        example=10,
+    )
+    rest_time_sec: int = Field(
+        default=60,
+        description='Rest time between sets in seconds',
+        example=60,
+    )
+    extra_weight: Optional[float] = Field(
+        default=None,
+        description='Extra weight for the exercise in kg',
+        example=5.0,
+    )
+
+
 class CreateTrainingWithExerciseIDs(BaseModel):
     client_id: int = Field(
         description='Client ID associated with the training',
@@ -104,12 +131,21 @@ class CreateTrainingWithExerciseIDs(BaseModel):
         description='Detailed description of the training',
         example='A cardio session focusing on endurance.',
     )
-    exercises: Optional[list[int]] = Field(
+    exercises: Optional[list[TrainingExerciseItem]] = Field(
         default=None,
-        description='Unique exercise IDs',
-        example='[1, 12, 5, 81]',
+        description='Unique exercise IDs or exercises with their sets, reps, rest time and extra weight, '
+                    'the order of the list is the order in the training',
+        example='[1, {"exercise_id": 12, "sets": 4, "reps": 8}, 5, 81]',
     )
 
+    @field_validator('exercises', mode='before')
+    @classmethod
+    def exercise_ids_to_items(cls, exercises):
+        if not exercises:
+            return exercises
+        return [{'exercise_id': ex} if isinstance(ex, int) else ex for ex in exercises]
+
+
 class GetTraining(BaseModel):
     id: int = Field(
         ge=0,
@@ -6,6 +6,15 @@ from pydantic import BaseModel, SecretStr
 dotenv.load_dotenv()
 
 
+class PoolSettings(BaseModel):
+    min_size: int
+    max_size: int
+    max_inactive_connection_lifetime: float
+    command_timeout: float
+    statement_timeout_ms: int
+    idle_in_transaction_timeout_ms: int
+
+
 class Settings(BaseModel):
     # POSTGRES
     POSTGRES_USER: str
@@ -13,6 +22,8 @@ class Settings(BaseModel):
     POSTGRES_PORT: int
     POSTGRES_HOST: str
     POSTGRES_DB: str
+    POSTGRES_POOLS: dict[str, PoolSettings]
+    PG_JSON_ROUTES: frozenset[str] = frozenset()
     # PAYMENT SERVICE
     PAYMENT_SERVICE_HOST: str
     # RABBIT MQ REPORT
@@ -54,6 +65,19 @@ class Settings(BaseModel):
                f"{self.PAY_RABBIT_HOST}/{self.PAY_RABBIT_PORT}"
 
 
+def get_pool_config(name: str, min_size: int, max_size: int) -> dict:
+    """Read the settings of the named pool from the env, e.g. PG_POOL_API_MAX_SIZE."""
+    prefix = f"PG_POOL_{name.upper()}_"
+    return {
+        "min_size": os.getenv(f"{prefix}MIN_SIZE", min_size),
+        "max_size": os.getenv(f"{prefix}MAX_SIZE", max_size),
+        "max_inactive_connection_lifetime": os.getenv(f"{prefix}MAX_INACTIVE_LIFETIME", 300),
+        "command_timeout": os.getenv(f"{prefix}COMMAND_TIMEOUT", 30),
+        "statement_timeout_ms": os.getenv(f"{prefix}STATEMENT_TIMEOUT_MS", 30_000),
+        "idle_in_transaction_timeout_ms": os.getenv(f"{prefix}IDLE_IN_TRANSACTION_TIMEOUT_MS", 60_000),
+    }
+
+
 DB_CONFIG = {
     "POSTGRES_USER": os.getenv("POSTGRES_USER"),
     "POSTGRES_PASSWORD": os.getenv("POSTGRES_PASSWORD"),
@@ -68,6 +92,17 @@ TEST_DB_CONFIG = {
     "POSTGRES_HOST": os.getenv("TEST_POSTGRES_HOST"),
     "POSTGRES_PORT": os.getenv("TEST_POSTGRES_PORT"),
 }
+POOLS_CONFIG = {
+    "POSTGRES_POOLS": {
+        "api": get_pool_config("api", min_size=5, max_size=20),
+        "consumer": get_pool_config("consumer", min_size=1, max_size=5),
+        "worker": get_pool_config("worker", min_size=1, max_size=2),
+    },
+}
+# Routes answering with the JSON rendered by Postgres, e.g. PG_JSON_ROUTES=trainings.get,trainings.list
+PG_JSON_CONFIG = {
+    "PG_JSON_ROUTES": frozenset(route.strip() for route in os.getenv("PG_JSON_ROUTES", "").split(",") if route.strip()),
+}
 PAYMENT_SERVICE_CONFIG = {
     "PAYMENT_SERVICE_HOST": os.getenv("PAYMENT_SERVICE_HOST"),
 }
@@ -84,5 +119,9 @@ RABBITMQ_PAYMENT = {
     'PAY_RABBIT_PORT': os.getenv("PAYMENT_RABBITMQ_AMQP_PORT"),
 }
 
-settings = Settings(**DB_CONFIG, **PAYMENT_SERVICE_CONFIG, **RABBITMQ_REPORT, **RABBITMQ_PAYMENT)
-settings_test_db = Settings(**TEST_DB_CONFIG, **PAYMENT_SERVICE_CONFIG, **RABBITMQ_REPORT, **RABBITMQ_PAYMENT)
+settings = Settings(
+    **DB_CONFIG, **POOLS_CONFIG, **PG_JSON_CONFIG, **PAYMENT_SERVICE_CONFIG, **RABBITMQ_REPORT, **RABBITMQ_PAYMENT
+)
+settings_test_db = Settings(
+    **TEST_DB_CONFIG, **POOLS_CONFIG, **PG_JSON_CONFIG, **PAYMENT_SERVICE_CONFIG, **RABBITMQ_REPORT, **RABBITMQ_PAYMENT
+)
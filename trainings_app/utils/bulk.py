@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from trainings_app.schemas.bulk import BulkCreateResult, BulkRowResult, BulkRowStatusEnum
+
+
+def make_bulk_result(records: list[Optional[BaseModel]]) -> BulkCreateResult:
+    """Build the per-row result of a bulk creation from the created records (None for skipped rows)."""
+    results = [
+        BulkRowResult(
+            index=index,
+            status=BulkRowStatusEnum.CREATED if record else BulkRowStatusEnum.SKIPPED,
+            record=record,
+        )
+        for index, record in enumerate(records)
+    ]
+    created = sum(1 for record in records if record)
+    return BulkCreateResult(created=created, skipped=len(records) - created, results=results)
@@ -0,0 +1,30 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build the strong ETag from the parts identifying the representation: the resource, its version, the query."""
+    digest = hashlib.blake2b('|'.join(map(str, parts)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the If-None-Match header of the request against the ETag, comparing them weakly as GET requires."""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def with_etag(result: Any, response: Response, etag: str) -> Any:
+    """Set the ETag on the response returned by the route, or on the injected one if the route returns data."""
+    (result if isinstance(result, Response) else response).headers['ETag'] = etag
+    return result
@@ -0,0 +1,39 @@
+import base64
+import binascii
+from typing import Optional, Sequence
+
+import orjson
+
+from trainings_app.exceptions.exceptions import CursorError
+from trainings_app.schemas.pagination import Page
+
+
+def encode_cursor(*key_values: int) -> str:
+    """Encode the primary key of the last record of the page into an opaque cursor."""
+    return base64.urlsafe_b64encode(orjson.dumps(key_values)).decode()
+
+
+def decode_cursor(cursor: Optional[str], key_size: int = 1) -> Optional[tuple]:
+    """Decode the cursor back into the primary key values."""
+    if not cursor:
+        return None
+    try:
+        key_values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise CursorError(f"Invalid cursor: {cursor}")
+    if (
+            not isinstance(key_values, list)
+            or len(key_values) != key_size
+            or not all(isinstance(value, int) for value in key_values)
+    ):
+        raise CursorError(f"Invalid cursor: {cursor}")
+    return tuple(key_values)
+
+
+def make_page(items: list, limit: int, key_fields: Sequence[str]) -> Page:
+    """Cut the items fetched with limit + 1 to the page and build the cursor of the next page."""
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(*(getattr(items[-1], field) for field in key_fields))
+    return Page(items=items, next_cursor=next_cursor)
@@ -1,20 +1,100 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
 from passlib.context import CryptContext
 from dotenv import load_dotenv
-import os
+
+from trainings_app.exceptions.exceptions import PasswordHashingBusyError
 
 load_dotenv()
 
+T = TypeVar('T')
+
 hashing_algorithm = os.getenv("HASHING_ALGORITHM", "bcrypt")
 deprecated_status = os.getenv("HASHING_DEPRECATED", "auto")
 
-pwd_context = CryptContext(schemes=[hashing_algorithm], deprecated=deprecated_status)
+HASHING_CONFIG = {
+    # Cost factor of new hashes; the stored ones with another cost are rehashed on login
+    'ROUNDS': int(os.getenv('HASHING_ROUNDS', 12)),
+    # bcrypt releases the GIL, so the threads hash in parallel
+    'MAX_WORKERS': int(os.getenv('HASHING_MAX_WORKERS', min(4, os.cpu_count() or 1))),
+    # Hashes running or waiting for a thread, above it the request is rejected with 503
+    'MAX_PENDING': int(os.getenv('HASHING_MAX_PENDING', 64)),
+}
+
+pwd_context = CryptContext(
+    schemes=[hashing_algorithm],
+    deprecated=deprecated_status,
+    **{f"{hashing_algorithm}__rounds": HASHING_CONFIG['ROUNDS']},
+)
+
+
+class PasswordHasher:
+    """Runs the hashing in a dedicated thread pool, so it never blocks the event loop."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hashing')
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        # Only touched from the event loop thread, no lock is needed
+        if self.pending >= self.max_pending:
+            raise PasswordHashingBusyError()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def run_many(self, func: Callable[..., T], args_list: list[tuple]) -> list[T]:
+        """
+        Runs the calls in waves of max_workers, so every thread is busy and the rest of the pending slots stay free
+        for the logins. The slots of a wave are reserved for the whole batch before the first call,
+        so the batch is either rejected at once or never rejected after the hashing has started.
+        """
+        reserved = min(self.max_workers, len(args_list))
+        if self.pending + reserved > self.max_pending:
+            raise PasswordHashingBusyError()
+        self.pending += reserved
+        try:
+            loop = asyncio.get_running_loop()
+            results = []
+            for start in range(0, len(args_list), self.max_workers):
+                wave = args_list[start:start + self.max_workers]
+                results.extend(await asyncio.gather(
+                    *(loop.run_in_executor(self._executor, func, *args) for args in wave)
+                ))
+            return results
+        finally:
+            self.pending -= reserved
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=HASHING_CONFIG['MAX_WORKERS'],
+    max_pending=HASHING_CONFIG['MAX_PENDING'],
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash on all the threads of the pool: about MAX_WORKERS / 0.25 s hashes per second with the cost 12."""
+    return await password_hasher.run_many(pwd_context.hash, [(password,) for password in passwords])
 
 
-def hash_password(password: str) -> str:
-    """Generates a hashed password from the provided password."""
-    return pwd_context.hash(password)
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(pwd_context.verify, password, hashed_password)
 
 
-def verify_password(password: str, hashed_password: str) -> bool:
-    """Returns the result of comparing the password with the hashed_password."""
-    return pwd_context.verify(password, hashed_password)
+async def verify_and_update_password(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify the password and return the new hash if the stored one uses outdated settings."""
+    return await password_hasher.run(pwd_context.verify_and_update, password, hashed_password)
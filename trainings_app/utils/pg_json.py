@@ -0,0 +1,32 @@
+from typing import Sequence
+
+import orjson
+from asyncpg import Record
+from fastapi import Response
+
+from trainings_app.settings import settings
+from trainings_app.utils.pagination import encode_cursor
+
+
+def pg_json_enabled(route: str) -> bool:
+    """Check whether the route answers with the JSON rendered by Postgres."""
+    return route in settings.PG_JSON_ROUTES
+
+
+def pg_json_response(json_text: str) -> Response:
+    """Return the JSON rendered by Postgres as is, without parsing and serializing it again."""
+    return Response(content=json_text, media_type='application/json')
+
+
+def pg_json_page_response(records: Sequence[Record], limit: int, key_fields: Sequence[str]) -> Response:
+    """
+    Join the rows rendered by Postgres into the Page JSON.
+    The records are fetched with limit + 1 rows to know if there is the next page.
+    """
+    items = records[:limit]
+    next_cursor = None
+    if len(records) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(*(last[field] for field in key_fields))
+    content = f'{{"items":[{",".join(record["json"] for record in items)}],"next_cursor":'
+    return Response(content=content.encode() + orjson.dumps(next_cursor) + b'}', media_type='application/json')
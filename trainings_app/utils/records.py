@@ -0,0 +1,71 @@
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Callable, Iterable, Mapping, Optional, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from trainings_app.custom_loggers.repositories import repo_logger
+from trainings_app.exceptions.exceptions import ConvertRecordError
+
+M = TypeVar('M', bound=BaseModel)
+
+
+def _to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+@lru_cache(maxsize=None)
+def _field_converters(model: Type[BaseModel]) -> tuple[tuple[tuple[str, Callable], ...], Optional[frozenset]]:
+    """
+    Find the fields whose column values differ from the model types:
+    Postgres enums come as str and NUMERIC columns as Decimal.
+    Returns the converters and the field names of a model that may be built without model_construct,
+    or None for a model with private attributes or extra fields.
+    """
+    converters = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        types = get_args(annotation) if get_origin(annotation) is Union else (annotation,)
+        for field_type in types:
+            if isinstance(field_type, type) and issubclass(field_type, Enum):
+                converters.append((name, field_type._value2member_map_.__getitem__))
+                break
+            if field_type is float:
+                converters.append((name, _to_float))
+                break
+    plain = not model.__private_attributes__ and model.model_config.get('extra') != 'allow'
+    return tuple(converters), frozenset(model.model_fields) if plain else None
+
+
+def model_from_record(model: Type[M], record: Mapping, **extra) -> M:
+    """
+    Build the model from a row of our own typed columns without validating it.
+    Only the enum and numeric values are converted, so the model serializes the same way as a validated one.
+    Raises ConvertRecordError on a value missing from the enum.
+    """
+    converters, field_names = _field_converters(model)
+    data = dict(record, **extra)
+    try:
+        for name, convert in converters:
+            value = data.get(name)
+            if value is not None:
+                data[name] = convert(value)
+    except KeyError as e:
+        repo_logger.error(f"Convert to model Error: unknown enum value {str(e)}")
+        raise ConvertRecordError(record=dict(record), error_detail=f"Unknown enum value {str(e)}")
+    if data.keys() != field_names:
+        return model.model_construct(**data)
+    # The row has exactly the model fields, so set the state model_construct would set after filling the defaults.
+    # test_model_from_record compares both paths to catch a pydantic upgrade changing it.
+    instance = model.__new__(model)
+    object.__setattr__(instance, '__dict__', data)
+    object.__setattr__(instance, '__pydantic_fields_set__', set(data))
+    object.__setattr__(instance, '__pydantic_extra__', None)
+    object.__setattr__(instance, '__pydantic_private__', None)
+    return instance
+
+
+def models_from_records(model: Type[M], records: Iterable[Mapping]) -> list[M]:
+    """Build the models from the rows of our own typed columns without validating them."""
+    return [model_from_record(model, record) for record in records]
@@ -0,0 +1,14 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    Serialize the already built models straight to JSON bytes with pydantic-core.
+    Returning it from a route skips the response_model validation and jsonable_encoder of FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
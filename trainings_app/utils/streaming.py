@@ -0,0 +1,70 @@
+from decimal import Decimal
+from typing import AsyncIterator, Callable
+
+import orjson
+from asyncpg import Connection, Pool, Record
+from fastapi.responses import StreamingResponse
+
+from trainings_app.custom_loggers.main import main_logger
+from trainings_app.schemas.streaming import StreamFormatEnum
+
+STREAM_CHUNK_ROWS = 500
+
+media_types = {
+    StreamFormatEnum.NDJSON: 'application/x-ndjson',
+    StreamFormatEnum.JSON: 'application/json',
+}
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+async def _render_records(
+        pool: Pool,
+        iter_records: Callable[[Connection], AsyncIterator[Record]],
+        stream_format: StreamFormatEnum,
+) -> AsyncIterator[bytes]:
+    """
+    Serialize the records into chunks of STREAM_CHUNK_ROWS rows while they are read from the cursor.
+    A failure after the first chunk is logged and re-raised: the server then drops the connection without
+    the end of the chunked body, so the client sees an error instead of a complete-looking truncated response.
+    """
+    is_json = stream_format == StreamFormatEnum.JSON
+    separator = b',' if is_json else b'\n'
+    rows = 0
+    # The connection is acquired here and not via Depends: dependencies are closed before the body is streamed
+    async with pool.acquire() as conn:
+        chunk = bytearray(b'[' if is_json else b'')
+        try:
+            async for record in iter_records(conn):
+                if is_json and rows:
+                    chunk += separator
+                chunk += orjson.dumps(dict(record), default=_default)
+                if not is_json:
+                    chunk += separator
+                rows += 1
+                if rows % STREAM_CHUNK_ROWS == 0:
+                    yield bytes(chunk)
+                    chunk.clear()
+        except Exception as e:
+            main_logger.error(f"Export stream Error after {rows} rows: {e!r}")
+            raise
+        if is_json:
+            chunk += b']'
+        if chunk:
+            yield bytes(chunk)
+
+
+def stream_records(
+        pool: Pool,
+        iter_records: Callable[[Connection], AsyncIterator[Record]],
+        stream_format: StreamFormatEnum = StreamFormatEnum.NDJSON,
+) -> StreamingResponse:
+    """Returns a response streaming the records produced by iter_records on a connection from the pool."""
+    return StreamingResponse(
+        _render_records(pool, iter_records, stream_format),
+        media_type=media_types[stream_format],
+    )